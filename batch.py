@@ -0,0 +1,265 @@
+from calculator_engine import ERROR_TEXT
+from expression import NUM, VAR, NEG, BIN, CALL, FUNCTIONS, OPERATOR_ALIASES, ExpressionError, compile_expression
+from numeric import get_backend
+from scientific import SIN_EXACT, COS_EXACT, TAN_EXACT
+from array import array
+import math
+
+try:
+    import numpy
+except ImportError:  # без numpy пакеты считаются циклом по элементам
+    numpy = None
+
+# Операции кнопок калькулятора в виде выражений над x (число) и y (операнд)
+OPERATION_EXPRESSIONS = {
+    '+': 'x + y', '-': 'x - y', '*': 'x * y', '/': 'x / y', '^': 'x ^ y',
+    '%': 'x / 100', 'percentage': 'x / 100', '±': '-x', 'negate': '-x',
+}
+
+
+class BatchResult:
+    """Результат пакетного вычисления: значения и маска ошибок"""
+
+    __slots__ = ('values', 'errors', 'backend')
+
+    def __init__(self, values, errors, backend):
+        self.values = values
+        # Где errors[i] истинно, дисплей показал бы 'Ошибка', а values[i] не определено:
+        # None в списке, NaN в массиве numpy
+        self.errors = errors
+        self.backend = backend
+
+    def __len__(self):
+        return len(self.values)
+
+    def error_count(self):
+        if numpy is not None and isinstance(self.errors, numpy.ndarray):
+            return int(numpy.count_nonzero(self.errors))
+        return sum(self.errors)
+
+    def texts(self):
+        """Значения так, как их показал бы дисплей"""
+        values, errors = self.values, self.errors
+        if numpy is not None and isinstance(values, numpy.ndarray):
+            values, errors = values.tolist(), errors.tolist()
+        format = self.backend.format
+        return [ERROR_TEXT if error else format(value) for value, error in zip(values, errors)]
+
+    def __repr__(self):
+        return f'BatchResult(size={len(self)}, errors={self.error_count()})'
+
+
+def vector_trig(function, exact):
+    """Тригонометрия в градусах над массивом, с теми же точными углами, что в scientific"""
+    def trig(x):
+        # x - массив или число (sin(30) в выражении над столбцом)
+        x = numpy.asarray(x, dtype=numpy.float64)
+        values = function(numpy.radians(x))
+        turn = x % 360.0
+        for angle, value in exact.items():
+            values = numpy.where(turn == angle, value, values)
+        return values
+    return trig
+
+
+# Векторные версии операций реестра: (функция, область определения или None).
+# Заполняется при наличии numpy; функции реестра без векторной версии
+# вычисляются циклом
+VECTOR_FUNCTIONS = {}
+
+if numpy is not None:
+    VECTOR_FUNCTIONS.update({
+        'sin': (vector_trig(numpy.sin, SIN_EXACT), None),
+        'cos': (vector_trig(numpy.cos, COS_EXACT), None),
+        'tan': (vector_trig(numpy.tan, TAN_EXACT), lambda x: x % 180.0 != 90.0),
+        'log': (numpy.log10, lambda x: x > 0),
+        'ln': (numpy.log, lambda x: x > 0),
+        'sqrt': (numpy.sqrt, lambda x: x >= 0),
+        'square': (lambda x: x * x, None),
+        'cube': (lambda x: x * x * x, None),
+        'inverse': (lambda x: 1 / x, lambda x: x != 0),
+        'abs': (numpy.abs, None),
+        'pi': (lambda: math.pi, None),
+        'e': (lambda: math.e, None),
+    })
+
+
+def vectorizable(node):
+    """Можно ли вычислить дерево операциями numpy"""
+    kind = node[0]
+    if kind == NEG:
+        return vectorizable(node[1])
+    if kind == BIN:
+        return vectorizable(node[2]) and vectorizable(node[3])
+    if kind == CALL:
+        return node[1] in VECTOR_FUNCTIONS and all(vectorizable(arg) for arg in node[2])
+    return True
+
+
+def evaluate_vector(node, columns):
+    """Вычисляем дерево над массивами float64; возвращаем (значения, ошибки)
+
+    Ошибки повторяют поведение apply_operator и Operation: деление на
+    ноль, выход из области определения, переполнение степени и
+    комплексный результат. Ошибка аргумента переходит в результат.
+    """
+    kind = node[0]
+    if kind == NUM:
+        return float(node[1]), False
+    if kind == VAR:
+        try:
+            return columns[node[1]], False
+        except KeyError:
+            raise ExpressionError(f"Неизвестная переменная '{node[1]}'") from None
+    if kind == NEG:
+        values, errors = evaluate_vector(node[1], columns)
+        return -values, errors
+    if kind == BIN:
+        op = node[1]
+        left, left_errors = evaluate_vector(node[2], columns)
+        right, right_errors = evaluate_vector(node[3], columns)
+        errors = left_errors | right_errors
+        if op == '+':
+            return left + right, errors
+        if op == '-':
+            return left - right, errors
+        if op == '*':
+            return left * right, errors
+        if op == '/':
+            return left / right, errors | (right == 0)
+        values = numpy.power(left, right)
+        # В Python конечные операнды с бесконечным или NaN результатом -
+        # OverflowError, ZeroDivisionError или комплексное число
+        overflow = ~numpy.isfinite(values) & numpy.isfinite(left) & numpy.isfinite(right)
+        return values, errors | overflow
+    if kind == CALL:
+        function, domain = VECTOR_FUNCTIONS[node[1]]
+        args = [evaluate_vector(arg, columns) for arg in node[2]]
+        if not args:
+            return function(), False
+        (x, errors), = args
+        # Область определения над числом дала бы bool, а ~True == -2
+        x = numpy.asarray(x, dtype=numpy.float64)
+        values = numpy.asarray(function(x), dtype=numpy.float64)
+        if domain is not None:
+            errors = errors | ~domain(x)
+        # math.sin(inf) и подобные бросают ValueError там, где numpy дает NaN
+        return values, errors | (numpy.isnan(values) & ~numpy.isnan(x))
+    raise ExpressionError(f"Неизвестный узел '{kind}'")
+
+
+def python_values(column):
+    """Числа numpy как числа Python: repr(numpy.float64(0.1)) не разбирают Decimal и Fraction"""
+    if numpy is not None and isinstance(column, (numpy.ndarray, numpy.generic)):
+        return column.tolist()
+    return column
+
+
+def evaluate_rows(expression, columns, constants, length):
+    """Вычисляем выражение по строкам тем же кодом, что и CalculatorEngine"""
+    backend = expression.backend
+    evaluator = expression.evaluator
+    coerce = backend.coerce
+    values = [None] * length
+    errors = [False] * length
+    try:
+        variables = {name: coerce(python_values(value)) for name, value in constants.items()}
+    except (ValueError, ArithmeticError):
+        # Общее для всех строк значение не разобралось - ошибка в каждой строке
+        return values, [True] * length
+    names = list(columns)
+    # Приведение к типу бэкенда - внутри try: плохое значение портит только свою строку
+    with backend.context():
+        if len(names) == 1:
+            name, = names
+            for index, value in enumerate(python_values(columns[name])):
+                try:
+                    variables[name] = coerce(value)
+                    values[index] = coerce(evaluator(variables, FUNCTIONS))
+                except (ValueError, ArithmeticError):
+                    errors[index] = True
+        else:
+            rows = zip(*(python_values(column) for column in columns.values()))
+            for index, row in enumerate(rows):
+                try:
+                    variables.update(zip(names, map(coerce, row)))
+                    values[index] = coerce(evaluator(variables, FUNCTIONS))
+                except (ValueError, ArithmeticError):
+                    errors[index] = True
+    return values, errors
+
+
+def is_column(value):
+    return isinstance(value, (list, tuple, array)) or (numpy is not None and isinstance(value, numpy.ndarray))
+
+
+def evaluate_batch(expression, columns, backend=None, vectorized=None):
+    """Вычисляем выражение для каждого набора значений переменных
+
+    expression - текст ('x * 1.2 + y') или Expression, columns - словарь
+    имя -> столбец (список, кортеж, array.array, массив numpy) или одно
+    число, общее для всех строк. Ошибки не прерывают пакет, а отмечаются
+    в BatchResult.errors, как 'Ошибка' на дисплее.
+
+    С numpy выражение над float-числами считается целыми массивами;
+    по умолчанию так делается, если среди столбцов есть массив numpy.
+    Векторный путь считает во float64 без целого режима FloatBackend:
+    2 + 3 дает 5.0, а целая степень больше float64 (180 ^ 400) отмечается
+    как ошибка переполнения, хотя в интерфейсе она точная.
+    """
+    if isinstance(expression, str):
+        expression = compile_expression(expression, backend or get_backend())
+    backend = expression.backend
+    sequences = {name: value for name, value in columns.items() if is_column(value)}
+    constants = {name: value for name, value in columns.items() if name not in sequences}
+    if not sequences:
+        raise ValueError('Нужен хотя бы один столбец значений')
+    lengths = {len(column) for column in sequences.values()}
+    if len(lengths) > 1:
+        raise ValueError(f'Столбцы разной длины: {sorted(lengths)}')
+    length, = lengths
+
+    if vectorized is None:
+        vectorized = (
+            numpy is not None and backend.name == 'float'
+            and any(isinstance(column, numpy.ndarray) for column in sequences.values())
+        )
+    if vectorized:
+        if numpy is None:
+            raise ValueError('Векторное вычисление требует numpy')
+        if backend.name != 'float' or not vectorizable(expression.tree):
+            raise ValueError(f'Выражение нельзя вычислить векторно: {expression.text}')
+        arrays = {name: numpy.asarray(column, dtype=numpy.float64) for name, column in sequences.items()}
+        arrays.update((name, float(value)) for name, value in constants.items())
+        with numpy.errstate(all='ignore'):
+            values, errors = evaluate_vector(expression.tree, arrays)
+            values = numpy.broadcast_to(values, (length,)).copy()
+        errors = numpy.broadcast_to(errors, (length,)).copy()
+        values[errors] = numpy.nan
+        return BatchResult(values, errors, backend)
+
+    values, errors = evaluate_rows(expression, sequences, constants, length)
+    return BatchResult(values, errors, backend)
+
+
+def apply_batch(operation, values, operand=None, backend=None, vectorized=None):
+    """Операция калькулятора над столбцом чисел
+
+    operation - кнопка ('+', '-', '×', '÷', '^', '%', '±'), ее имя
+    ('percentage', 'negate') или имя функции реестра scientific.OPERATIONS
+    ('sin', 'sqrt', ...).
+    Для бинарных операций operand - второе число или столбец той же длины.
+    """
+    operation = OPERATOR_ALIASES.get(operation, operation)
+    text = OPERATION_EXPRESSIONS.get(operation)
+    if text is None:
+        function = FUNCTIONS.get(operation)
+        if function is None or function.arity != 1:
+            raise ValueError(f"Неизвестная операция '{operation}'")
+        text = f'{operation}(x)'
+    columns = {'x': values}
+    if 'y' in text:
+        if operand is None:
+            raise ValueError(f"Операции '{operation}' нужен второй операнд")
+        columns['y'] = operand
+    return evaluate_batch(text, columns, backend, vectorized)
@@ -0,0 +1,106 @@
+"""Пакетное вычисление столбцов: цикл по ядру, batch по списку и numpy
+
+Для каждого размера столбца считается выражение с делением (часть
+делителей - нули, они дают 'Ошибка' в маске) и синус в градусах.
+Сравниваются: поэлементный вызов CalculatorEngine, как при наборе в
+интерфейсе, evaluate_batch по списку (цикл по скомпилированному
+выражению) и evaluate_batch по массивам numpy. Цикл по списку
+ограничен размером --loop-max, а ядро, которое разбирает каждую строку
+заново, считает только первые --engine-rows строк.
+
+Запуск: python benchmarks/bench_batch.py [--sizes 1000000,10000000] [--loop-max N] [--engine-rows N]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from common import ROOT
+
+sys.path.insert(0, ROOT)
+
+from batch import apply_batch, evaluate_batch, numpy  # noqa: E402
+from calculator_engine import CalculatorEngine  # noqa: E402
+
+EXPRESSION = 'x * 1.2 + x / y'
+
+
+def engine_loop(xs, ys):
+    """Как в интерфейсе: число, операции, второе число, '=' на каждую строку"""
+    engine = CalculatorEngine()
+    errors = 0
+    for x, y in zip(xs, ys):
+        engine.clear()
+        engine.buffer.load(repr(x))
+        engine.new_number = False
+        engine.set_operation('*')
+        engine.buffer.load('1.2')
+        engine.new_number = False
+        engine.set_operation('+')
+        engine.buffer.load(repr(x))
+        engine.new_number = False
+        engine.set_operation('/')
+        engine.buffer.load(repr(y))
+        engine.new_number = False
+        errors += engine.calculate() is None
+    return errors
+
+
+def timed(func):
+    start = time.perf_counter()
+    errors = func()
+    return time.perf_counter() - start, errors
+
+
+def run(sizes, loop_max, engine_rows):
+    rng = random.Random(1)
+    results = []
+    for size in sizes:
+        xs = [rng.uniform(-1000, 1000) for _ in range(size)]
+        ys = [rng.choice((0.0, rng.uniform(1, 50))) for _ in range(size)]
+        rows = min(size, engine_rows)
+        variants = [('expression', 'engine loop', rows, lambda: engine_loop(xs[:rows], ys[:rows]))]
+        if size <= loop_max:
+            variants += [
+                ('expression', 'batch list', size, lambda: evaluate_batch(EXPRESSION, {'x': xs, 'y': ys}).error_count()),
+                ('sin', 'batch list', size, lambda: apply_batch('sin', xs).error_count()),
+            ]
+        if numpy is not None:
+            x_array = numpy.array(xs)
+            y_array = numpy.array(ys)
+            variants += [
+                ('expression', 'batch numpy', size,
+                 lambda: evaluate_batch(EXPRESSION, {'x': x_array, 'y': y_array}).error_count()),
+                ('sin', 'batch numpy', size, lambda: apply_batch('sin', x_array).error_count()),
+            ]
+        for workload, name, count, func in variants:
+            seconds, errors = timed(func)
+            results.append({
+                'size': size,
+                'workload': workload,
+                'variant': name,
+                'rows': count,
+                'seconds': seconds,
+                'elements_per_sec': count / seconds,
+                'errors': errors,
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000000,10000000')
+    parser.add_argument('--loop-max', type=int, default=1000000)
+    parser.add_argument('--engine-rows', type=int, default=100000)
+    args = parser.parse_args()
+    sizes = [int(value) for value in args.sizes.split(',')]
+
+    print(f"{'size':>9} {'workload':<11} {'variant':<12} {'rows':>9} {'seconds':>8} {'elements/s':>12} {'errors':>8}")
+    for row in run(sizes, args.loop_max, args.engine_rows):
+        print(f"{row['size']:>9} {row['workload']:<11} {row['variant']:<12} {row['rows']:>9} {row['seconds']:>8.3f} "
+              f"{row['elements_per_sec']:>12.0f} {row['errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
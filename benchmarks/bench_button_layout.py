@@ -0,0 +1,114 @@
+"""Время до первого кадра для сетки из 20 кнопок create_buttons
+
+Сравнивается прежний CyberpunkButton, который на каждое изменение pos/size
+очищает canvas.before и создает Color и RoundedRectangle заново, с
+текущим, который меняет геометрию существующего фона. Замеряется сборка
+сетки с первым кадром, перекладка после смены размера (поворот экрана)
+отдельно от отрисовки и число инструкций, созданных за перекладку: кадр
+в основном занимает отрисовка окна, и разница кнопок в нем теряется.
+Ограничение FPS снято, чтобы в кадр не попадало ожидание.
+
+Запуск: python benchmarks/bench_button_layout.py [--repeat N] [--module final_calculator]
+"""
+
+import argparse
+import importlib
+
+from common import setup_headless, measure, summary
+
+setup_headless()
+
+from kivy.config import Config  # noqa: E402
+
+Config.set('graphics', 'maxfps', '0')
+
+from kivy.base import EventLoop  # noqa: E402
+from kivy.core.window import Window  # noqa: E402
+from kivy.graphics import Color, RoundedRectangle  # noqa: E402
+from kivy.metrics import dp  # noqa: E402
+from kivy.uix.boxlayout import BoxLayout  # noqa: E402
+
+
+def legacy_button_class(module):
+    """CyberpunkButton с прежней перестройкой фона"""
+
+    class LegacyButton(module.CyberpunkButton):
+        def update_canvas(self, *args):
+            self.canvas.before.clear()
+            with self.canvas.before:
+                Color(0, 0, 0, 0.9)
+                RoundedRectangle(pos=self.pos, size=self.size, radius=[dp(20), ])
+
+    return LegacyButton
+
+
+def run(module_name, repeat):
+    module = importlib.import_module(module_name)
+    calculator = module.CyberpunkCalculator(staged=False)
+    calculator.rain_scheduler.stop()
+    current = module.CyberpunkButton
+    results = []
+    for name, button_class in (('rebuild', legacy_button_class(module)), ('in place', current)):
+        module.CyberpunkButton = button_class
+        panel = None
+
+        def first_frame():
+            nonlocal panel
+            if panel is not None:
+                Window.remove_widget(panel)
+            # Размер задается вручную: иначе окно вернет панели свой размер при перекладке
+            panel = BoxLayout(orientation='vertical', size_hint=(None, None), size=(800, 600))
+            calculator.create_buttons(panel)
+            Window.add_widget(panel)
+            EventLoop.idle()
+
+        build = summary(measure(first_frame, repeat))
+
+        sizes = [(800, 600), (600, 800)]
+        grid = panel.children[0]
+
+        def rotate():
+            panel.size = sizes[0]
+            sizes.reverse()
+            panel.do_layout()
+            grid.do_layout()
+
+        relayout = summary(measure(rotate, repeat))
+        # Старые инструкции держим, чтобы их id не достались новым
+        before = [instruction for button in grid.children for instruction in button.canvas.before.children]
+        known = {id(instruction) for instruction in before}
+        rotate()
+        allocated = sum(
+            1 for button in grid.children for instruction in button.canvas.before.children
+            if id(instruction) not in known
+        )
+        rotate()
+        EventLoop.idle()
+        frame = summary(measure(lambda: (rotate(), EventLoop.idle()), repeat))
+        Window.remove_widget(panel)
+        results.append({
+            'button': name,
+            'first_frame_ms': build['mean_ms'],
+            'relayout_ms': relayout['median_ms'],
+            'relayout_frame_ms': frame['median_ms'],
+            'instructions_per_relayout': allocated,
+        })
+    module.CyberpunkButton = current
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--module', default='final_calculator',
+                        choices=['final_calculator', 'simple_calculator'])
+    args = parser.parse_args()
+
+    print(f"{'button':<9} {'first frame ms':>15} {'relayout ms':>12} {'relayout+frame ms':>18} {'new instructions':>17}")
+    for row in run(args.module, args.repeat):
+        print(f"{row['button']:<9} {row['first_frame_ms']:>15.3f} {row['relayout_ms']:>12.3f} "
+              f"{row['relayout_frame_ms']:>18.3f} {row['instructions_per_relayout']:>17}")
+
+
+if __name__ == '__main__':
+    main()
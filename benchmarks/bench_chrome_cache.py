@@ -0,0 +1,116 @@
+"""Кадр и задержка нажатия с кэшем панели в Fbo и без него
+
+Для каждого варианта приложения калькулятор строится целиком, дождь
+двигается вручную, а кадры крутятся через EventLoop.idle, как в
+приложении: с тиком Clock, поэтому отложенное обновление дисплея и
+анимации кнопок попадают в замер. Замеряется кадр без нажатий и время от
+нажатия кнопки (trigger_action, как от пальца) до конца кадра, в котором
+метка дисплея показывает результат. Ограничение FPS снято (maxfps = 0);
+варианты с кэшем и без чередуются --rounds раз, в таблице - медианы.
+
+Запуск: python benchmarks/bench_chrome_cache.py [--apps final_calculator] [--frames N] [--presses N]
+"""
+
+import argparse
+import os
+import time
+
+from common import setup_headless, summary
+
+setup_headless()
+
+from kivy.config import Config  # noqa: E402
+
+Config.set('graphics', 'maxfps', '0')
+
+from kivy.base import EventLoop  # noqa: E402
+from kivy.core.window import Window  # noqa: E402
+
+APPS = ('final_calculator', 'simple_calculator')
+DIGITS = '123456789'
+# Кадров на одно нажатие больше этого - значит, дисплей не обновился вовсе
+MAX_FRAMES = 10
+
+
+def frame(calculator):
+    """Кадр приложения: шаг дождя, тик Clock и отрисовка окна, в мс"""
+    start = time.perf_counter()
+    calculator.matrix_rain.update(1.0 / 30.0)
+    EventLoop.idle()
+    return (time.perf_counter() - start) * 1000.0
+
+
+def press(calculator, key):
+    """Мс от нажатия кнопки до кадра, где метка дисплея показывает результат"""
+    display = calculator.display
+    start = time.perf_counter()
+    calculator.buttons[key].trigger_action(0)
+    for _ in range(MAX_FRAMES):
+        frame(calculator)
+        if display.result_label.text == display.result_text:
+            return (time.perf_counter() - start) * 1000.0
+    raise RuntimeError(f'display did not show {display.result_text!r} after {key!r}')
+
+
+def measure_app(app, cached, frames, presses):
+    os.environ['CALCUHILL_CHROME_CACHE'] = '1' if cached else '0'
+    module = __import__(app)
+    calculator = module.CyberpunkCalculator(staged=False)
+    calculator.rain_scheduler.stop()
+    Window.add_widget(calculator)
+    for _ in range(5):
+        frame(calculator)
+
+    idle = [frame(calculator) for _ in range(frames)]
+    latencies = []
+    for n in range(presses):
+        if n % 8 == 0:
+            press(calculator, 'C')
+        latencies.append(press(calculator, DIGITS[n % len(DIGITS)]))
+        # Между нажатиями доигрывают анимации кнопок
+        for _ in range(3):
+            frame(calculator)
+    Window.remove_widget(calculator)
+    calculator.history_store.close()
+    return {
+        'app': app,
+        'chrome_cache': cached,
+        'idle_frame_ms': summary(idle)['median_ms'],
+        'press_to_display_ms': summary(latencies)['median_ms'],
+    }
+
+
+def run(apps, frames, presses, rounds=3):
+    results = []
+    for app in apps:
+        # Первый калькулятор в процессе прогревает GL и кэши текстур - его не считаем
+        measure_app(app, True, 10, 2)
+        # Программный GL шумит от прогона к прогону: варианты чередуются, берется медиана прогонов
+        runs = {True: [], False: []}
+        for _ in range(rounds):
+            for cached in (True, False):
+                runs[cached].append(measure_app(app, cached, frames, presses))
+        for cached, rows in runs.items():
+            row = dict(rows[0])
+            for key in ('idle_frame_ms', 'press_to_display_ms'):
+                row[key] = summary([item[key] for item in rows])['median_ms']
+            results.append(row)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--apps', default=','.join(APPS))
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--presses', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'app':<20} {'chrome cache':<13} {'idle frame ms':>14} {'press to display ms':>20}")
+    for row in run(args.apps.split(','), args.frames, args.presses, args.rounds):
+        print(f"{row['app']:<20} {str(row['chrome_cache']):<13} {row['idle_frame_ms']:>14.3f} "
+              f"{row['press_to_display_ms']:>20.3f}")
+
+
+if __name__ == '__main__':
+    main()
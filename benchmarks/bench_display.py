@@ -0,0 +1,110 @@
+"""Серия нажатий и обновления дисплея CyberpunkDisplay
+
+Дисплей получает серию изменений result_text (быстрый набор или
+воспроизведение сценария), после чего рисуется один кадр. Считается
+время серии вместе с кадром, сколько раз менялся текст метки (каждая
+смена - новая растеризация текстуры) и сколько анимаций мигания было
+запущено. Для сравнения замеряется прежний дисплей, который запускал
+новую анимацию и менял текст на каждое изменение.
+
+Запуск: python benchmarks/bench_display.py [--bursts 1,10,100,1000] [--repeat N]
+"""
+
+import argparse
+
+from common import setup_headless, measure, summary
+
+setup_headless()
+
+from kivy.animation import Animation, Sequence  # noqa: E402
+from kivy.clock import Clock  # noqa: E402
+from kivy.core.window import Window  # noqa: E402
+import cyberpunk_calculator  # noqa: E402
+import final_calculator  # noqa: E402
+
+
+def legacy(display_class, low):
+    """Прежний update_result: анимация и смена текста на каждое изменение"""
+
+    class LegacyDisplay(display_class):
+        def update_result(self, instance, value):
+            anim = Animation(opacity=low, duration=0.1) + Animation(opacity=1.0, duration=0.1)
+            anim.start(self.result_label)
+            self.result_label.text = value
+
+    return LegacyDisplay
+
+
+def render():
+    Clock.tick()
+    Window.dispatch('on_draw')
+    Window.dispatch('on_flip')
+
+
+def run(bursts, repeat):
+    displays = (
+        ('cyberpunk', cyberpunk_calculator.CyberpunkDisplay),
+        ('cyberpunk legacy', legacy(cyberpunk_calculator.CyberpunkDisplay, 0.5)),
+        ('final', final_calculator.CyberpunkDisplay),
+        ('final legacy', legacy(final_calculator.CyberpunkDisplay, 0.7)),
+    )
+    results = []
+    for burst in bursts:
+        for name, display_class in displays:
+            display = display_class()
+            Window.add_widget(display)
+            render()
+            counters = {'text': 0, 'animations': 0}
+            display.result_label.bind(text=lambda *args: counters.__setitem__('text', counters['text'] + 1))
+            # Мигание - последовательность из двух Animation, считаем ее запуски
+            original_start = Sequence.start
+
+            def counting_start(animation, widget):
+                counters['animations'] += 1
+                original_start(animation, widget)
+
+            Sequence.start = counting_start
+            typed = [0]
+
+            def keystrokes():
+                for _ in range(burst):
+                    typed[0] += 1
+                    display.result_text = str(typed[0])
+                render()
+
+            try:
+                timings = measure(keystrokes, repeat)
+            finally:
+                Sequence.start = original_start
+            Animation.cancel_all(display.result_label)
+            Window.remove_widget(display)
+            render()
+
+            stats = summary(timings)
+            results.append({
+                'burst': burst,
+                'display': name,
+                'mean_ms': stats['mean_ms'],
+                'median_ms': stats['median_ms'],
+                'label_updates': counters['text'] / repeat,
+                'animations': counters['animations'] / repeat,
+                'shown': display.result_label.text == display.result_text,
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bursts', default='1,10,100,1000')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    bursts = [int(value) for value in args.bursts.split(',')]
+
+    print(f"{'burst':>6} {'display':<17} {'mean ms':>9} {'median ms':>10} {'label':>7} {'anims':>7} shown")
+    for row in run(bursts, args.repeat):
+        print(f"{row['burst']:>6} {row['display']:<17} {row['mean_ms']:>9.3f} {row['median_ms']:>10.3f} "
+              f"{row['label_updates']:>7.1f} {row['animations']:>7.1f} {row['shown']}")
+
+
+if __name__ == '__main__':
+    main()
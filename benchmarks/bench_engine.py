@@ -0,0 +1,64 @@
+"""Пропускная способность CalculatorEngine без интерфейса
+
+Ядро прогоняет типичную последовательность нажатий (цифры, операции,
+знак, процент, синус, равно) и считает операции в секунду. Kivy при этом
+не импортируется.
+
+Запуск: python benchmarks/bench_engine.py [--ops N]
+"""
+
+import argparse
+import sys
+import time
+
+from common import ROOT
+
+sys.path.insert(0, ROOT)
+
+from calculator_engine import CalculatorEngine  # noqa: E402
+
+SEQUENCE = (
+    ('add_number', '1'), ('add_number', '2'), ('add_number', '.'), ('add_number', '5'),
+    ('set_operation', '*'), ('add_number', '3'), ('set_operation', '+'),
+    ('add_number', '7'), ('calculate', None), ('negate', None), ('percentage', None),
+    ('sin', None), ('set_operation', '/'), ('add_number', '0'), ('calculate', None),
+    ('clear', None),
+)
+
+
+def run(ops):
+    results = []
+    history = []
+    for name, on_result in (('engine', None), ('engine+history', lambda e, r: history.append(r))):
+        engine = CalculatorEngine(on_result=on_result)
+        calls = [
+            (getattr(engine, method), (arg,) if arg is not None else ())
+            for method, arg in SEQUENCE
+        ]
+        rounds = max(1, ops // len(calls))
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for method, args in calls:
+                method(*args)
+        elapsed = time.perf_counter() - start
+        results.append({
+            'case': name,
+            'ops': rounds * len(calls),
+            'ops_per_sec': rounds * len(calls) / elapsed,
+            'ns_per_op': elapsed / (rounds * len(calls)) * 1e9,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ops', type=int, default=2000000)
+    args = parser.parse_args()
+
+    print(f"{'case':<15} {'ops':>10} {'ops/s':>12} {'ns/op':>8}")
+    for row in run(args.ops):
+        print(f"{row['case']:<15} {row['ops']:>10} {row['ops_per_sec']:>12.0f} {row['ns_per_op']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""Скорость разбора выражений и повторного вычисления готового дерева
+
+Корпус - выражения с клавиатуры калькулятора и случайные выражения со
+скобками, унарным минусом, функциями и переменными. Замеряется
+токенизация, полный разбор и вычисление уже разобранного дерева. Для
+кэша отдельно прогоняются несколько формул (НДС, наценка, перевод
+единиц), которые пересчитываются с разными значениями переменных.
+
+Запуск: python benchmarks/bench_expression.py [--count N] [--seed S]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from common import ROOT
+
+sys.path.insert(0, ROOT)
+
+from expression import Expression, ExpressionCache, parse, tokenize  # noqa: E402
+
+KEYPAD = [
+    '2 + 3 × 4', '12.5 * 3.0', '7.0 + -3.0 ÷ 2', '100 - 5 * 2 + 8 / 4',
+    '-(2 + 3) × (4 - 1)', '2 ^ 3 ^ 2', 'sin(30) + cos(60)', 'sqrt(16) * x',
+]
+FORMULAS = [
+    'x * 1.2', 'x × (1 + y / 100)', 'x / (1 - y / 100)', '(x - 32) × 5 ÷ 9',
+    'x * 2.54', 'x * (1 + y/100) ^ z', 'x - x × y / 100', 'sqrt(x^2 + y^2)',
+]
+
+
+def random_expression(rng, depth=0):
+    if depth > 3 or rng.random() < 0.3:
+        choice = rng.random()
+        if choice < 0.7:
+            return str(round(rng.uniform(0, 1000), rng.randint(0, 3)))
+        if choice < 0.85:
+            return rng.choice('xyz')
+        return f"sin({random_expression(rng, depth + 1)})"
+    left = random_expression(rng, depth + 1)
+    right = random_expression(rng, depth + 1)
+    op = rng.choice(['+', '-', '×', '÷', '*', '/'])
+    text = f"{left} {op} {right}"
+    if rng.random() < 0.3:
+        text = f"({text})"
+    if rng.random() < 0.1:
+        text = f"-{text}"
+    return text
+
+
+def corpus(count, seed):
+    rng = random.Random(seed)
+    texts = list(KEYPAD)
+    while len(texts) < count:
+        texts.append(random_expression(rng))
+    return texts
+
+
+def timed(func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return time.perf_counter() - start
+
+
+def run(count, seed):
+    texts = corpus(count, seed)
+    chars = sum(len(text) for text in texts)
+    variables = {'x': 1.5, 'y': 2.0, 'z': 3.0}
+    expressions = [Expression(text) for text in texts]
+
+    def evaluate(expression):
+        try:
+            expression.evaluate(variables)
+        except ValueError:
+            pass
+
+    results = []
+    for name, seconds in (
+        ('tokenize', timed(tokenize, texts)),
+        ('parse', timed(parse, texts)),
+        ('evaluate tree', timed(evaluate, expressions)),
+    ):
+        results.append({
+            'case': name,
+            'expressions': len(texts),
+            'expr_per_sec': len(texts) / seconds,
+            'mb_per_sec': chars / seconds / 1e6,
+        })
+
+    # Повторяющиеся формулы с разными входными значениями
+    rng = random.Random(seed)
+    workload = [
+        (rng.choice(FORMULAS), {'x': rng.uniform(1, 1000), 'y': rng.uniform(1, 30), 'z': 2.0})
+        for _ in range(count)
+    ]
+    cache = ExpressionCache()
+    for name, compile_text in (('formulas parse', Expression), ('formulas cached', cache.get)):
+        seconds = timed(lambda item: compile_text(item[0]).evaluate(item[1]), workload)
+        results.append({
+            'case': name,
+            'expressions': len(workload),
+            'expr_per_sec': len(workload) / seconds,
+            'mb_per_sec': sum(len(text) for text, _ in workload) / seconds / 1e6,
+        })
+    stats = cache.stats()
+    results[-1].update(hits=stats['hits'], misses=stats['misses'], evictions=stats['evictions'])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'case':<16} {'expressions':>11} {'expr/s':>10} {'MB/s':>7}")
+    for row in run(args.count, args.seed):
+        print(f"{row['case']:<16} {row['expressions']:>11} {row['expr_per_sec']:>10.0f} {row['mb_per_sec']:>7.2f}")
+        if 'hits' in row:
+            print(f"{'':<16} hits {row['hits']}, misses {row['misses']}, evictions {row['evictions']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Стоимость атласа глифов: холодная сборка, загрузка из кэша и CoreLabel на символ
+
+Запуск: python benchmarks/bench_glyph_atlas.py [--repeat N]
+"""
+
+import argparse
+import tempfile
+
+from common import setup_headless, measure, summary
+
+setup_headless()
+
+from kivy.core.text import Label as CoreLabel  # noqa: E402
+from glyph_atlas import GlyphAtlas  # noqa: E402
+from matrix_rain import MatrixRain  # noqa: E402
+
+
+def per_glyph_labels(chars, font_name):
+    """Прежний подход: отдельный CoreLabel на каждый символ"""
+    options = {'font_name': font_name} if font_name else {}
+    for char in chars:
+        label = CoreLabel(text=char, font_size=16, **options)
+        label.refresh()
+
+
+def run(repeat):
+    # Символы и шрифт - те, что выбрал MatrixRain (без шрифта с катаканой - запасные)
+    atlas = MatrixRain(drop_count=1).atlas
+    chars, font_name = atlas.chars, atlas.font_name
+    with tempfile.TemporaryDirectory() as cache_dir:
+        def cold():
+            atlas = GlyphAtlas(chars, font_name=font_name, cache_dir=cache_dir)
+            with open(atlas.cache_path, 'wb'):
+                pass
+
+        def cached():
+            GlyphAtlas(chars, font_name=font_name, cache_dir=cache_dir)
+
+        cached()
+        rows = [
+            ('atlas cold build', measure(cold, repeat)),
+            ('atlas from cache', measure(cached, repeat)),
+            ('CoreLabel per glyph', measure(lambda: per_glyph_labels(chars, font_name), repeat)),
+        ]
+    return [dict(case=name, glyphs=len(chars), **summary(timings)) for name, timings in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'case':<20} {'glyphs':>7} {'mean ms':>9} {'median ms':>10}")
+    for row in run(args.repeat):
+        print(f"{row['case']:<20} {row['glyphs']:>7} {row['mean_ms']:>9.3f} {row['median_ms']:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Задержка добавления записи в историю при растущей длине истории
+
+Для каждого размера история заполняется заранее, после чего замеряется
+добавление одной записи вместе с кадром, в котором она появляется. Для
+сравнения замеряется старая панель на GridLayout, где каждая запись
+была отдельным виджетом (её заполнение медленное, поэтому она
+ограничена размером --legacy-max). Ограничение FPS снимается
+(maxfps = 0), иначе Clock.tick ждал бы следующего кадра и прятал цену
+добавления.
+
+Запуск: python benchmarks/bench_history.py [--sizes 0,1000,10000,100000] [--repeat N]
+"""
+
+import argparse
+
+from common import setup_headless, measure, summary
+
+setup_headless()
+
+from kivy.config import Config  # noqa: E402
+
+Config.set('graphics', 'maxfps', '0')
+
+from kivy.clock import Clock  # noqa: E402
+from kivy.core.window import Window  # noqa: E402
+from kivy.metrics import dp  # noqa: E402
+from kivy.uix.boxlayout import BoxLayout  # noqa: E402
+from kivy.uix.gridlayout import GridLayout  # noqa: E402
+from kivy.uix.label import Label  # noqa: E402
+from kivy.uix.scrollview import ScrollView  # noqa: E402
+from history_panel import HistoryPanel  # noqa: E402
+
+
+class LegacyHistoryPanel(BoxLayout):
+    """Прежняя панель: GridLayout в ScrollView, по виджету на запись"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.orientation = 'vertical'
+        self.history_list = GridLayout(cols=1, spacing=dp(5), size_hint_y=None)
+        self.history_list.bind(minimum_height=self.history_list.setter('height'))
+        scroll = ScrollView(size_hint=(1, 1))
+        scroll.add_widget(self.history_list)
+        self.add_widget(scroll)
+
+    def add_history_item(self, expression, result):
+        item = BoxLayout(orientation='vertical', size_hint_y=None, height=dp(60))
+        item.add_widget(Label(text=expression, font_size=dp(14)))
+        item.add_widget(Label(text=f'= {result}', font_size=dp(16), bold=True))
+        self.history_list.add_widget(item)
+
+
+def render():
+    Clock.tick()
+    Window.dispatch('on_draw')
+    Window.dispatch('on_flip')
+
+
+def prefill(panel, size):
+    if isinstance(panel, HistoryPanel):
+        panel.history_view.data = [
+            {'expression': f'{n} + 1', 'result': str(n + 1)} for n in range(size)
+        ]
+    else:
+        for n in range(size):
+            panel.add_history_item(f'{n} + 1', str(n + 1))
+    render()
+
+
+def run(sizes, repeat, legacy_max):
+    results = []
+    for name, panel_class in (('recycleview', HistoryPanel), ('gridlayout', LegacyHistoryPanel)):
+        for size in sizes:
+            if panel_class is LegacyHistoryPanel and size > legacy_max:
+                continue
+            panel = panel_class()
+            Window.add_widget(panel)
+            prefill(panel, size)
+
+            def append():
+                panel.add_history_item('2 + 2', '4')
+                render()
+
+            timings = summary(measure(append, repeat))
+            Window.remove_widget(panel)
+            results.append({
+                'panel': name,
+                'entries': size,
+                'append_frame_ms': timings['mean_ms'],
+                'append_frame_median_ms': timings['median_ms'],
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='0,1000,10000,100000')
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--legacy-max', type=int, default=2000)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    print(f"{'panel':<12} {'entries':>8} {'append+frame ms':>16} {'median ms':>10}")
+    for row in run(sizes, args.repeat, args.legacy_max):
+        print(f"{row['panel']:<12} {row['entries']:>8} "
+              f"{row['append_frame_ms']:>16.3f} {row['append_frame_median_ms']:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
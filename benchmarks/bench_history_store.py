@@ -0,0 +1,68 @@
+"""Журнал истории: цена записи для интерфейса и время загрузки при старте
+
+Замеряется, сколько стоит вызов append в потоке интерфейса (запись на
+диск идет в фоне), и сколько занимает загрузка последних записей из
+журналов разной длины по сравнению с чтением всего файла.
+
+Запуск: python benchmarks/bench_history_store.py [--sizes 1000,100000,1000000] [--limit N]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+
+from common import setup_headless, measure, summary
+
+setup_headless()
+
+from history_store import HistoryStore, HISTORY_LIMIT  # noqa: E402
+
+
+def fill(path, size):
+    record = {'time': '2024-01-01T00:00:00', 'expression': '12.5 * 3.0', 'result': '37.5'}
+    line = json.dumps(record) + '\n'
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(line * size)
+
+
+def load_all(path, limit):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f][-limit:]
+
+
+def run(sizes, limit, appends):
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'history.jsonl')
+        store = HistoryStore(path)
+        append = summary(measure(lambda: store.append('2 + 2', '4'), appends))
+        store.close()
+        results.append({'case': 'append', 'records': appends, 'ui_ms': append['mean_ms']})
+
+        for size in sizes:
+            fill(path, size)
+            store = HistoryStore(path)
+            recent = summary(measure(lambda: store.load_recent(limit), 5))
+            store.close()
+            full = summary(measure(lambda: load_all(path, limit), 1))
+            results.append({'case': 'load_recent', 'records': size, 'ui_ms': recent['median_ms']})
+            results.append({'case': 'load_all', 'records': size, 'ui_ms': full['median_ms']})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,100000,1000000')
+    parser.add_argument('--limit', type=int, default=HISTORY_LIMIT)
+    parser.add_argument('--appends', type=int, default=10000)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    print(f"{'case':<12} {'records':>9} {'ms':>10}")
+    for row in run(sizes, args.limit, args.appends):
+        print(f"{row['case']:<12} {row['records']:>9} {row['ui_ms']:>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Набор длинного числа: строка с конкатенацией против InputBuffer
+
+Старое ядро держало набираемое число строкой: каждая цифра - новая
+строка через +=, каждая точка - поиск '.' по всей строке, смена знака -
+срез или склейка. На вставке длинного числа (тысячи цифр) это дает
+квадратичное время. Замеряется набор числа по символу с периодической
+сменой знака и стиранием; дисплей читает текст один раз в конце, как
+после объединения обновлений в кадр.
+
+Запуск: python benchmarks/bench_input_buffer.py [--lengths 100,1000,10000,100000]
+"""
+
+import argparse
+import sys
+import time
+
+from common import ROOT
+
+sys.path.insert(0, ROOT)
+
+from input_buffer import InputBuffer  # noqa: E402
+
+
+class StringInput:
+    """Прежняя логика CalculatorEngine.add_number/negate на строке"""
+
+    def __init__(self):
+        self.current_number = '0'
+        self.new_number = True
+
+    def append(self, number):
+        if self.new_number:
+            self.current_number = number
+            self.new_number = False
+        elif number == '.' and '.' not in self.current_number:
+            self.current_number += number
+        elif number != '.':
+            self.current_number += number
+
+    def negate(self):
+        if self.current_number != '0':
+            if self.current_number.startswith('-'):
+                self.current_number = self.current_number[1:]
+            else:
+                self.current_number = '-' + self.current_number
+
+    def backspace(self):
+        self.current_number = self.current_number[:-1] or '0'
+
+    @property
+    def text(self):
+        return self.current_number
+
+
+def keystrokes(length):
+    """Цифры с точкой в середине; каждые 100 символов смена знака и стирание"""
+    keys = []
+    for n in range(length):
+        keys.append('.' if n == length // 2 else str(n % 10))
+        if n % 100 == 99:
+            keys += ['negate', 'backspace', '.']
+    return keys
+
+
+def timed(factory, keys):
+    start = time.perf_counter()
+    entry = factory()
+    for key in keys:
+        if key == 'negate':
+            entry.negate()
+        elif key == 'backspace':
+            entry.backspace()
+        else:
+            entry.append(key)
+    text = entry.text
+    return time.perf_counter() - start, text
+
+
+def run(lengths):
+    results = []
+    for length in lengths:
+        keys = keystrokes(length)
+        for name, factory in (('string', StringInput), ('InputBuffer', InputBuffer)):
+            seconds, text = timed(factory, keys)
+            results.append({
+                'length': length,
+                'input': name,
+                'keystrokes': len(keys),
+                'ns_per_key': seconds / len(keys) * 1e9,
+                'total_ms': seconds * 1000,
+                'text_length': len(text),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lengths', default='100,1000,10000,100000')
+    args = parser.parse_args()
+    lengths = [int(value) for value in args.lengths.split(',')]
+
+    print(f"{'length':>8} {'input':<12} {'keys':>8} {'ns/key':>10} {'total ms':>10}")
+    for row in run(lengths):
+        print(f"{row['length']:>8} {row['input']:<12} {row['keystrokes']:>8} "
+              f"{row['ns_per_key']:>10.1f} {row['total_ms']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
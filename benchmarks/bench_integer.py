@@ -0,0 +1,93 @@
+"""Целый режим float-бэкенда против чистого float на целочисленной нагрузке
+
+Корпус - целые выражения, как их набирают на клавиатуре: сложение,
+вычитание, умножение и деление нацело, плюс большие числа. Замеряется
+разбор чисел из текста вместе с вычислением скомпилированного выражения
+x op y и путь через CalculatorEngine по нажатиям; отдельно считается,
+сколько результатов совпали с точным целым ответом.
+
+Запуск: python benchmarks/bench_integer.py [--count N]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from common import ROOT
+
+sys.path.insert(0, ROOT)
+
+from calculator_engine import CalculatorEngine  # noqa: E402
+from expression import Expression  # noqa: E402
+from numeric import FloatBackend  # noqa: E402
+
+
+def integer_corpus(rng, count):
+    corpus = []
+    for _ in range(count):
+        a = rng.randint(1, 10 ** rng.randint(1, 20))
+        b = rng.randint(1, 10 ** rng.randint(1, 8))
+        op = rng.choice('+-*/')
+        if op == '/':
+            a *= b
+        corpus.append((a, op, b))
+    return corpus
+
+
+def exact(a, op, b):
+    return {'+': a + b, '-': a - b, '*': a * b, '/': a // b}[op]
+
+
+def run(count):
+    rng = random.Random(1)
+    corpus = integer_corpus(rng, count)
+    operands = [(str(a), op, str(b)) for a, op, b in corpus]
+
+    results = []
+    for name, backend in (('int fast path', FloatBackend()), ('float only', FloatBackend(integers=False))):
+        expressions = {op: Expression(f'x {op} y', backend) for op in '+-*/'}
+        parse = backend.parse
+        start = time.perf_counter()
+        values = [expressions[op].evaluate({'x': parse(a), 'y': parse(b)}) for a, op, b in operands]
+        evaluate_seconds = time.perf_counter() - start
+        correct = sum(value == exact(*item) for value, item in zip(values, corpus))
+
+        engine = CalculatorEngine(backend=backend)
+        presses = []
+        for a, op, b in corpus[:count // 10]:
+            presses += [(engine.add_number, digit) for digit in str(a)]
+            presses.append((engine.set_operation, op))
+            presses += [(engine.add_number, digit) for digit in str(b)]
+            presses.append((engine.calculate, None))
+        start = time.perf_counter()
+        for method, arg in presses:
+            if arg is None:
+                method()
+            else:
+                method(arg)
+        engine_seconds = time.perf_counter() - start
+
+        results.append({
+            'mode': name,
+            'evaluations_per_sec': len(operands) / evaluate_seconds,
+            'keystrokes_per_sec': len(presses) / engine_seconds,
+            'exact_results': correct / len(corpus),
+            'two_plus_three': engine.backend.format(Expression('2 + 3', backend).evaluate()),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{'mode':<14} {'evaluations/s':>14} {'keystrokes/s':>13} {'exact':>7}  2 + 3")
+    for row in run(args.count):
+        print(f"{row['mode']:<14} {row['evaluations_per_sec']:>14.0f} {row['keystrokes_per_sec']:>13.0f} "
+              f"{row['exact_results']:>7.1%}  {row['two_plus_three']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Задержка от нажатия цифры до кадра с ней на дисплее
+
+Для каждого варианта приложения калькулятор строится целиком, дождь
+останавливается, а затем цифры набираются через add_number, как это
+делает кнопка. После каждого нажатия крутятся кадры EventLoop.idle, пока
+текст метки результата не совпадет с result_text дисплея: общий дисплей
+(display.py) меняет метку в ближайшем кадре через Clock.create_trigger. Ограничение
+FPS снимается (maxfps = 0), чтобы в замер не попадало ожидание кадра.
+Число набирается до --digits цифр и сбрасывается clear вне замера.
+
+Запуск: python benchmarks/bench_keystroke.py [--apps main,final_calculator] [--presses N] [--digits N]
+"""
+
+import argparse
+import time
+
+from common import setup_headless
+
+setup_headless()
+
+from kivy.config import Config  # noqa: E402
+
+Config.set('graphics', 'maxfps', '0')
+
+from kivy.base import EventLoop  # noqa: E402
+from kivy.core.window import Window  # noqa: E402
+
+APPS = ('main', 'simple_calculator', 'cyberpunk_calculator', 'final_calculator')
+DIGITS = '123456789'
+# Кадров на одно нажатие больше этого - значит, дисплей не обновился вовсе
+MAX_FRAMES = 10
+
+
+def percentile(ordered, percent):
+    return ordered[(len(ordered) - 1) * percent // 100]
+
+
+def press(calculator, digit):
+    """Время add_number и время до кадра, где метка показывает результат, в мс"""
+    display = calculator.display
+    start = time.perf_counter()
+    calculator.add_number(digit)
+    call = time.perf_counter() - start
+    frames = 0
+    while True:
+        EventLoop.idle()
+        frames += 1
+        if display.result_label.text == display.result_text:
+            break
+        if frames == MAX_FRAMES:
+            raise RuntimeError(f'display did not show {display.result_text!r} after {frames} frames')
+    return call * 1000.0, (time.perf_counter() - start) * 1000.0, frames
+
+
+def run(apps, presses, digits):
+    results = []
+    for app in apps:
+        module = __import__(app)
+        calculator = module.CyberpunkCalculator(staged=False)
+        calculator.rain_scheduler.stop()
+        Window.add_widget(calculator)
+        for _ in range(5):
+            EventLoop.idle()
+
+        calls, latencies, frames = [], [], 0
+        for n in range(presses):
+            if n % digits == 0:
+                calculator.clear()
+                EventLoop.idle()
+            call, latency, count = press(calculator, DIGITS[n % len(DIGITS)])
+            calls.append(call)
+            latencies.append(latency)
+            frames += count
+        Window.remove_widget(calculator)
+        calculator.history_store.close()
+
+        calls.sort()
+        latencies.sort()
+        results.append({
+            'app': app,
+            'presses': presses,
+            'add_number_us': percentile(calls, 50) * 1000.0,
+            'press_to_display_median_ms': percentile(latencies, 50),
+            'press_to_display_p95_ms': percentile(latencies, 95),
+            'press_to_display_max_ms': latencies[-1],
+            'frames_per_press': frames / presses,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--apps', default=','.join(APPS))
+    parser.add_argument('--presses', type=int, default=500)
+    parser.add_argument('--digits', type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'app':<22} {'add_number us':>14} {'median ms':>10} {'p95 ms':>8} {'max ms':>8} {'frames':>7}")
+    for row in run(args.apps.split(','), args.presses, args.digits):
+        print(f"{row['app']:<22} {row['add_number_us']:>14.1f} {row['press_to_display_median_ms']:>10.3f} "
+              f"{row['press_to_display_p95_ms']:>8.3f} {row['press_to_display_max_ms']:>8.3f} "
+              f"{row['frames_per_press']:>7.2f}")
+
+
+if __name__ == '__main__':
+    main()
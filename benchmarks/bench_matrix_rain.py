@@ -0,0 +1,118 @@
+"""Время кадра MatrixRain для разных способов отрисовки
+
+Сравниваются прежняя отрисовка (canvas.clear() и новые инструкции каждый
+кадр), постоянные инструкции Color + Rectangle и единый Mesh с обновлением
+столбцов капель циклом (loop) и через numpy. Для каждого варианта
+выводятся время update, время полного кадра с отрисовкой окна, FPS, число
+вызовов отрисовки и число новых инструкций за кадр. Варианты с отдельной
+инструкцией на символ при количестве капель больше 1000 тратят на кадр
+секунды, поэтому для них замеряется только PER_GLYPH_FRAMES кадров;
+число замеренных кадров есть в каждой строке.
+
+Запуск: python benchmarks/bench_matrix_rain.py [--frames N] [--drops 50 500]
+"""
+
+import argparse
+import random
+
+from common import setup_headless, measure, summary
+
+setup_headless()
+
+from kivy.core.window import Window  # noqa: E402
+from kivy.graphics import Color, Rectangle  # noqa: E402
+from matrix_rain import MatrixRain, HAVE_NUMPY  # noqa: E402
+
+
+class ImmediateMatrixRain(MatrixRain):
+    """Прежняя отрисовка: canvas.clear() и новые Color/Rectangle каждый кадр"""
+
+    def draw(self):
+        self.canvas.clear()
+        with self.canvas:
+            for index, chars in enumerate(self.glyphs):
+                for i, char in enumerate(chars):
+                    Color(0, 1, 0, self.glyph_alpha(index, i))
+                    Rectangle(
+                        pos=(self.drop_x[index], self.drop_y[index] - i * self.char_step),
+                        size=(self.char_size, self.char_size)
+                    )
+
+    def draw_calls(self):
+        return sum(len(chars) for chars in self.glyphs)
+
+
+VARIANTS = (
+    ('immediate', ImmediateMatrixRain, 'instructions', False),
+    ('instructions', MatrixRain, 'instructions', False),
+    ('mesh/loop', MatrixRain, 'mesh', False),
+    ('mesh/numpy', MatrixRain, 'mesh', True),
+)
+PER_GLYPH_LIMIT = 1000
+# Кадров на замер для вариантов с инструкцией на символ выше PER_GLYPH_LIMIT
+PER_GLYPH_FRAMES = 5
+
+
+def new_instructions(rain):
+    """Сколько новых инструкций появилось на canvas за один кадр"""
+    before = list(rain.canvas.children)
+    known = {id(instruction) for instruction in before}
+    rain.update(1.0 / 60.0)
+    return sum(1 for instruction in rain.canvas.children if id(instruction) not in known)
+
+
+def render_frame(rain):
+    """Полный кадр: обновление дождя и отрисовка окна"""
+    rain.update(1.0 / 60.0)
+    Window.dispatch('on_draw')
+    Window.dispatch('on_flip')
+
+
+def run(frames, drop_counts):
+    results = []
+    for drops in drop_counts:
+        for name, cls, backend, vectorized in VARIANTS:
+            count = frames
+            if backend == 'instructions' and drops > PER_GLYPH_LIMIT:
+                count = min(frames, PER_GLYPH_FRAMES)
+            if vectorized and not HAVE_NUMPY:
+                continue
+            random.seed(drops)
+            rain = cls(drop_count=drops, backend=backend, vectorized=vectorized)
+            rain.update(1.0 / 60.0)
+            update = summary(measure(lambda: rain.update(1.0 / 60.0), count))
+
+            Window.add_widget(rain)
+            render_frame(rain)
+            frame = summary(measure(lambda: render_frame(rain), count))
+            Window.remove_widget(rain)
+
+            results.append({
+                'renderer': name,
+                'drops': drops,
+                'frames': count,
+                'update_ms': update['mean_ms'],
+                'frame_ms': frame['mean_ms'],
+                'fps': 1000.0 / frame['mean_ms'],
+                'draw_calls': rain.draw_calls(),
+                'allocations_per_frame': new_instructions(rain),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--drops', type=int, nargs='+', default=[20, 50, 500, 5000])
+    args = parser.parse_args()
+
+    print(f"{'renderer':<13} {'drops':>6} {'frames':>7} {'update ms':>10} {'frame ms':>9} "
+          f"{'fps':>7} {'draw calls':>11} {'alloc/frame':>12}")
+    for row in run(args.frames, args.drops):
+        print(f"{row['renderer']:<13} {row['drops']:>6} {row['frames']:>7} {row['update_ms']:>10.3f} "
+              f"{row['frame_ms']:>9.3f} {row['fps']:>7.1f} {row['draw_calls']:>11} "
+              f"{row['allocations_per_frame']:>12}")
+
+
+if __name__ == '__main__':
+    main()
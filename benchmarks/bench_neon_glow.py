@@ -0,0 +1,88 @@
+"""Быстрые нажатия по сетке из 20 кнопок cyberpunk_calculator
+
+Сравнивается свечение через общую текстуру, где анимация меняет только
+прозрачность Color, с наивной перестройкой двух RoundedRectangle на каждом
+шаге анимации. Каждый кадр нажимается случайная кнопка, тикают часы и
+перерисовывается окно.
+
+Запуск: python benchmarks/bench_neon_glow.py [--frames N]
+"""
+
+import argparse
+import random
+import time
+
+from common import setup_headless, summary
+
+setup_headless()
+
+from kivy.base import EventLoop  # noqa: E402
+from kivy.core.window import Window  # noqa: E402
+from kivy.graphics import Color, RoundedRectangle  # noqa: E402
+from kivy.uix.boxlayout import BoxLayout  # noqa: E402
+import cyberpunk_calculator  # noqa: E402
+
+
+class RebuildGlowButton(cyberpunk_calculator.CyberpunkButton):
+    """Наивное свечение: перестройка canvas.after на каждое изменение glow_intensity"""
+
+    def on_glow_intensity(self, instance, value):
+        self.canvas.after.clear()
+        with self.canvas.after:
+            Color(0, 1, 1, value * 0.3)
+            RoundedRectangle(pos=(self.x - 5, self.y - 5),
+                             size=(self.width + 10, self.height + 10), radius=[10, ])
+            Color(0, 1, 1, value * 0.6)
+            RoundedRectangle(pos=(self.x - 2, self.y - 2),
+                             size=(self.width + 4, self.height + 4), radius=[8, ])
+
+
+def instructions(buttons):
+    return [i for button in buttons for i in button.canvas.before.children + button.canvas.after.children]
+
+
+def run(frames):
+    calculator = cyberpunk_calculator.CyberpunkCalculator(staged=False)
+    calculator.rain_scheduler.stop()
+    current = cyberpunk_calculator.CyberpunkButton
+    results = []
+    for name, button_class in (('rebuild', RebuildGlowButton), ('texture', current)):
+        cyberpunk_calculator.CyberpunkButton = button_class
+        panel = BoxLayout()
+        calculator.create_buttons(panel)
+        buttons = panel.children[0].children
+        Window.add_widget(panel)
+        EventLoop.idle()
+
+        random.seed(0)
+        timings = []
+        created = 0
+        for _ in range(frames):
+            known = {id(i) for i in instructions(buttons)}
+            before = instructions(buttons)
+            start = time.perf_counter()
+            button = random.choice(buttons)
+            button.on_button_press(button)
+            EventLoop.idle()
+            timings.append((time.perf_counter() - start) * 1000.0)
+            created += sum(1 for i in instructions(buttons) if id(i) not in known)
+            del before
+        Window.remove_widget(panel)
+        results.append(dict(glow=name, allocations_per_frame=created / frames, **summary(timings)))
+    cyberpunk_calculator.CyberpunkButton = current
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{'glow':<8} {'mean ms':>9} {'median ms':>10} {'alloc/frame':>12}")
+    for row in run(args.frames):
+        print(f"{row['glow']:<8} {row['mean_ms']:>9.3f} {row['median_ms']:>10.3f} "
+              f"{row['allocations_per_frame']:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
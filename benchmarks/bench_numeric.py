@@ -0,0 +1,84 @@
+"""Скорость числовых режимов калькулятора: float, Decimal и Fraction
+
+Для каждого режима замеряется вычисление денежных выражений (цены с
+копейками, НДС, скидки) уже скомпилированным выражением и полный путь
+через CalculatorEngine по нажатиям клавиш. В последней колонке видно,
+точен ли режим на 0.1 + 0.2.
+
+Запуск: python benchmarks/bench_numeric.py [--count N] [--precision P]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from common import ROOT
+
+sys.path.insert(0, ROOT)
+
+from calculator_engine import CalculatorEngine  # noqa: E402
+from expression import Expression  # noqa: E402
+from numeric import get_backend  # noqa: E402
+
+MONEY = [
+    'x * 1.2', 'x + y', 'x * (1 - y / 100)', '(x + y) * 1.2 - y',
+    'x / 3', 'x * 0.07 + x', '(x - y) / x * 100',
+]
+
+
+def keystrokes(rng):
+    digits = f'{rng.uniform(0, 1000):.2f}'
+    return [('add_number', char) for char in digits] + [
+        ('set_operation', rng.choice('+-*/')),
+        ('add_number', str(rng.randint(1, 9))), ('add_number', '.'), ('add_number', '5'),
+        ('calculate', None), ('clear', None),
+    ]
+
+
+def run(count, precision):
+    rng = random.Random(1)
+    inputs = [(f'{rng.uniform(1, 1000):.2f}', f'{rng.uniform(1, 30):.2f}') for _ in range(count)]
+    presses = [press for _ in range(count // 10) for press in keystrokes(rng)]
+
+    results = []
+    for name, options in (('float', {}), ('decimal', {'precision': precision}), ('fraction', {})):
+        backend = get_backend(name, **options)
+        expressions = [Expression(text, backend) for text in MONEY]
+        values = [{'x': backend.parse(x), 'y': backend.parse(y)} for x, y in inputs]
+
+        start = time.perf_counter()
+        for n, variables in enumerate(values):
+            expressions[n % len(expressions)].evaluate(variables)
+        evaluate_seconds = time.perf_counter() - start
+
+        engine = CalculatorEngine(backend=backend)
+        calls = [(getattr(engine, method), (arg,) if arg is not None else ()) for method, arg in presses]
+        start = time.perf_counter()
+        for method, args in calls:
+            method(*args)
+        engine_seconds = time.perf_counter() - start
+
+        results.append({
+            'backend': name,
+            'evaluations_per_sec': len(values) / evaluate_seconds,
+            'keystrokes_per_sec': len(calls) / engine_seconds,
+            'point_one_plus_point_two': backend.format(Expression('0.1 + 0.2', backend).evaluate()),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=100000)
+    parser.add_argument('--precision', type=int, default=28)
+    args = parser.parse_args()
+
+    print(f"{'backend':<9} {'evaluations/s':>14} {'keystrokes/s':>13}  0.1 + 0.2")
+    for row in run(args.count, args.precision):
+        print(f"{row['backend']:<9} {row['evaluations_per_sec']:>14.0f} {row['keystrokes_per_sec']:>13.0f}  "
+              f"{row['point_one_plus_point_two']}")
+
+
+if __name__ == '__main__':
+    main()
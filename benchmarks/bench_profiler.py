@@ -0,0 +1,101 @@
+"""Цена профайлера: выключенный против включенного
+
+Замеряется вызов пустой функции напрямую, через Profiler.wrap
+выключенного и включенного профайлера и внутри блока span, то есть
+чистая добавка на один замер. Выключенный wrap должен отдавать ту же
+функцию и стоить ноль; включенный добавляет пару вызовов perf_counter
+и запись в кольцевой буфер. Для масштаба в конце печатаются перцентили
+CalculatorEngine.calculate, собранные включенным профайлером.
+
+Запуск: python benchmarks/bench_profiler.py [--calls N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from common import ROOT
+
+sys.path.insert(0, ROOT)
+
+from calculator_engine import CalculatorEngine  # noqa: E402
+from profiler import Profiler  # noqa: E402
+
+REPEAT = 5
+
+
+def noop():
+    pass
+
+
+def timed(calls, body):
+    start = time.perf_counter()
+    for _ in range(calls):
+        body()
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def calculate_stats(calls):
+    """Перцентили calculate по сессиям 2 + 3 × 4 = под включенным профайлером"""
+    profiler = Profiler(enabled=True, path=os.devnull)
+    raw = getattr(CalculatorEngine.calculate, '__wrapped__', CalculatorEngine.calculate)
+    calculate = profiler.wrap('calculate', raw)
+    engine = CalculatorEngine()
+    for _ in range(calls):
+        for digit, op in (('2', '+'), ('3', '*')):
+            engine.add_number(digit)
+            engine.set_operation(op)
+        engine.add_number('4')
+        calculate(engine)
+    return profiler.stats()['calculate']
+
+
+def run(calls):
+    disabled = Profiler(enabled=False)
+    enabled = Profiler(enabled=True, path=os.devnull)
+    off_wrap = disabled.wrap('noop', noop)
+    on_wrap = enabled.wrap('noop', noop)
+
+    def in_span(profiler):
+        def body():
+            with profiler.span('noop'):
+                noop()
+        return body
+
+    variants = (
+        ('plain', noop),
+        ('wrap disabled', off_wrap),
+        ('wrap enabled', on_wrap),
+        ('span disabled', in_span(disabled)),
+        ('span enabled', in_span(enabled)),
+    )
+    # Варианты чередуются, и берется лучший из повторов: так шум машины меньше влияет на разницу
+    best = {name: float('inf') for name, _ in variants}
+    for _ in range(REPEAT):
+        for name, body in variants:
+            best[name] = min(best[name], timed(calls, body))
+    results = [{
+        'variant': name,
+        'ns_per_call': best[name],
+        'overhead_ns': best[name] - best['plain'],
+        'same_function': name != 'wrap disabled' or off_wrap is noop,
+    } for name, _ in variants]
+    return results, calculate_stats(calls // 10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=100000)
+    args = parser.parse_args()
+
+    results, calculate = run(args.calls)
+    print(f"{'variant':<15} {'ns/call':>8} {'overhead ns':>12}")
+    for row in results:
+        print(f"{row['variant']:<15} {row['ns_per_call']:>8.0f} {row['overhead_ns']:>12.0f}"
+              + ('' if row['same_function'] else '  (wrap disabled returned a wrapper!)'))
+    print(f"\ncalculate: p50 {calculate['p50_ms'] * 1000:.2f} us, p95 {calculate['p95_ms'] * 1000:.2f} us, "
+          f"p99 {calculate['p99_ms'] * 1000:.2f} us, overruns {calculate['overruns']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+"""Воспроизведение записанных нажатий и задержка интерфейса
+
+Сценарий - текстовый файл, по сеансу на строку: надписи кнопок через
+пробел, например "7 × 8 + 3 =" (можно писать * / +- вместо × ÷ ±,
+строки с # пропускаются). Без файла --sessions раз повторяется
+DEFAULT_SESSION. Нажатие идет через кнопку из calculator.buttons
+(trigger_action: состояние down, on_press, on_release), как от пальца,
+поэтому в замер попадают и анимации кнопок. Калькулятор строится
+обычным образом (поэтапно, если не CALCUHILL_STAGED=0), дождь работает;
+ограничение FPS снято, а история пишется во временный KIVY_HOME из
+setup_headless, и каждый вариант начинает с пустой.
+
+Для каждого нажатия замеряется время до обновления result_text (оно
+меняется внутри on_press) и до конца кадра, в котором метка дисплея
+показывает результат; для "=" - еще и до конца кадра, в котором
+RecycleView панели истории показывает строку новой записи (список между
+нажатиями прокручивается вниз, куда дописываются записи), и отдельно
+время самого record_history - запись в журнал и в данные панели. Строка
+появляется в том же кадре, что и результат, поэтому по времени кадра
+историю от дисплея не отличить, а по record_history видна ее собственная
+доля. Задержки собираются по видам клавиш, задержки истории - отдельно и
+по четвертям прогона, чтобы был виден рост вместе с историей. Нажатия дольше бюджета
+кадра считаются подвисаниями, самые долгие печатаются с номером сеанса.
+
+Запуск: python benchmarks/bench_replay.py [--apps final_calculator] [--script FILE] [--sessions N] [--gap-frames N] [--worst N]
+"""
+
+import argparse
+import os
+import time
+
+from common import setup_headless
+
+setup_headless()
+
+from kivy.config import Config  # noqa: E402
+
+Config.set('graphics', 'maxfps', '0')
+
+from kivy.base import EventLoop  # noqa: E402
+from kivy.core.window import Window  # noqa: E402
+from profiler import FRAME_BUDGET_MS  # noqa: E402
+
+APPS = ('main', 'simple_calculator', 'cyberpunk_calculator', 'final_calculator')
+DEFAULT_SESSION = '7 × 8 + 3 ='
+ALIASES = {'*': '×', '/': '÷', '+-': '±', 'c': 'C'}
+KINDS = ('digit', 'operation', 'function', 'equals')
+# Кадров на одно нажатие больше этого - значит, дисплей не обновился вовсе
+MAX_FRAMES = 10
+
+
+def load_script(path, sessions):
+    """Сеансы как списки надписей кнопок"""
+    if path is None:
+        return [DEFAULT_SESSION.split()] * sessions
+    with open(path, encoding='utf-8') as f:
+        lines = [line.split() for line in f if line.strip() and not line.lstrip().startswith('#')]
+    return [[ALIASES.get(key, key) for key in keys] for keys in lines]
+
+
+def kind_of(key):
+    if key.isdigit() or key == '.':
+        return 'digit'
+    if key in ('+', '-', '×', '÷'):
+        return 'operation'
+    if key == '=':
+        return 'equals'
+    return 'function'
+
+
+def percentile(ordered, percent):
+    return ordered[(len(ordered) - 1) * percent // 100]
+
+
+def latency_row(app, kind, timings):
+    ordered = sorted(timings)
+    return {
+        'app': app,
+        'kind': kind,
+        'presses': len(ordered),
+        'median_ms': percentile(ordered, 50),
+        'p95_ms': percentile(ordered, 95),
+        'p99_ms': percentile(ordered, 99),
+        'max_ms': ordered[-1],
+        'stalls': sum(1 for ms in ordered if ms > FRAME_BUDGET_MS),
+    }
+
+
+def history_size(calculator):
+    panel = getattr(calculator, 'history_panel', None)
+    return len(panel.history_view.data) if panel is not None else 0
+
+
+def history_row_shown(calculator, index):
+    """Есть ли у RecycleView виджет строки истории index"""
+    view_adapter = calculator.history_panel.history_view.view_adapter
+    return view_adapter.get_visible_view(index) is not None
+
+
+def scroll_history_down(calculator):
+    """Держим список истории прокрученным вниз, чтобы новая строка попадала в окно"""
+    panel = getattr(calculator, 'history_panel', None)
+    if panel is not None and panel.history_view.scroll_y != 0:
+        panel.history_view.scroll_y = 0
+        EventLoop.idle()
+
+
+def time_records(calculator):
+    """Время каждого record_history в мс; ядро вызывает его через on_result"""
+    timings = []
+    record = calculator.engine.on_result
+
+    def timed_record(expression, result):
+        start = time.perf_counter()
+        record(expression, result)
+        timings.append((time.perf_counter() - start) * 1000.0)
+
+    calculator.engine.on_result = timed_record
+    return timings
+
+
+def press(calculator, key):
+    """Одно нажатие: мс до result_text, до кадра с ним на дисплее и до кадра со строкой новой записи истории"""
+    display = calculator.display
+    entries = history_size(calculator)
+    start = time.perf_counter()
+    calculator.buttons[key].trigger_action(0)
+    result_ms = (time.perf_counter() - start) * 1000.0
+    # Если панель истории еще не была построена, ее достроил первый "=", и эта задержка тоже в счет
+    row = history_size(calculator) - 1 if key == '=' and history_size(calculator) > entries else None
+    display_ms = history_ms = None
+    for _ in range(MAX_FRAMES):
+        EventLoop.idle()
+        now = (time.perf_counter() - start) * 1000.0
+        if display_ms is None and display.result_label.text == display.result_text:
+            display_ms = now
+        if row is not None and history_ms is None and history_row_shown(calculator, row):
+            history_ms = now
+        if display_ms is not None and (row is None or history_ms is not None):
+            break
+    if display_ms is None:
+        raise RuntimeError(f'display did not show {display.result_text!r} after {key!r}')
+    if row is not None and history_ms is None:
+        raise RuntimeError(f'history row {row} was not shown after {key!r}')
+    return result_ms, display_ms, history_ms
+
+
+def replay(app, sessions, gap_frames):
+    module = __import__(app)
+    calculator = module.CyberpunkCalculator()
+    Window.add_widget(calculator)
+    EventLoop.idle()
+    records = time_records(calculator)
+
+    presses = []
+    for index, keys in enumerate(sessions):
+        for key in keys:
+            recorded = len(records)
+            result_ms, display_ms, history_ms = press(calculator, key)
+            record_ms = records[-1] if len(records) > recorded else None
+            presses.append((index, key, result_ms, display_ms, history_ms, record_ms))
+            for _ in range(gap_frames):
+                EventLoop.idle()
+            scroll_history_down(calculator)
+    calculator.build_stages.finish()
+    calculator.rain_scheduler.stop()
+    Window.remove_widget(calculator)
+    calculator.history_store.close()
+    # Следующий вариант приложения тоже начинает с пустой истории
+    os.remove(calculator.history_store.path)
+    return presses
+
+
+def latency_rows(app, presses):
+    """Строки задержек одного варианта приложения по видам клавиш"""
+    rows = [latency_row(app, 'result_text', [item[2] for item in presses])]
+    for kind in KINDS:
+        timings = [item[3] for item in presses if kind_of(item[1]) == kind]
+        if timings:
+            rows.append(latency_row(app, kind, timings))
+    history = [item[4] for item in presses if item[4] is not None]
+    if history:
+        records = [item[5] for item in presses if item[4] is not None]
+        row = latency_row(app, 'history', history)
+        quarter = max(1, len(history) // 4)
+        row['first_quarter_median_ms'] = percentile(sorted(history[:quarter]), 50)
+        row['last_quarter_median_ms'] = percentile(sorted(history[-quarter:]), 50)
+        row['record_median_ms'] = percentile(sorted(records), 50)
+        row['record_p95_ms'] = percentile(sorted(records), 95)
+        row['record_first_quarter_median_ms'] = percentile(sorted(records[:quarter]), 50)
+        row['record_last_quarter_median_ms'] = percentile(sorted(records[-quarter:]), 50)
+        rows.append(row)
+    return rows
+
+
+def worst_presses(presses, count):
+    """Самые долгие до дисплея нажатия с номером сеанса"""
+    return [
+        {'session': index, 'key': key, 'display_ms': display_ms}
+        for index, key, _, display_ms, _, _ in sorted(presses, key=lambda item: -item[3])[:count]
+    ]
+
+
+def run(apps, sessions, gap_frames):
+    results = []
+    for app in apps:
+        results.extend(latency_rows(app, replay(app, sessions, gap_frames)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--apps', default='final_calculator')
+    parser.add_argument('--script')
+    parser.add_argument('--sessions', type=int, default=1000)
+    parser.add_argument('--gap-frames', type=int, default=1)
+    parser.add_argument('--worst', type=int, default=5)
+    args = parser.parse_args()
+
+    sessions = load_script(args.script, args.sessions)
+    rows, worst = [], {}
+    for app in args.apps.split(','):
+        presses = replay(app, sessions, args.gap_frames)
+        rows.extend(latency_rows(app, presses))
+        worst[app] = worst_presses(presses, args.worst)
+    print(f"{'app':<22} {'kind':<12} {'presses':>8} {'median ms':>10} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'stalls':>7}")
+    for row in rows:
+        print(f"{row['app']:<22} {row['kind']:<12} {row['presses']:>8} {row['median_ms']:>10.3f} "
+              f"{row['p95_ms']:>8.3f} {row['p99_ms']:>8.3f} {row['max_ms']:>8.3f} {row['stalls']:>7}")
+    for row in rows:
+        if row['kind'] == 'history':
+            print(f"\n{row['app']}: медиана истории в первой четверти {row['first_quarter_median_ms']:.3f} мс, "
+                  f"в последней {row['last_quarter_median_ms']:.3f} мс; record_history "
+                  f"{row['record_first_quarter_median_ms']:.3f} и {row['record_last_quarter_median_ms']:.3f} мс")
+    for app, presses in worst.items():
+        if presses:
+            print(f"\n{app}: самые долгие нажатия")
+            for item in presses:
+                print(f"  сеанс {item['session']:>6}  {item['key']:<4} {item['display_ms']:>8.3f} мс")
+
+
+if __name__ == '__main__':
+    main()
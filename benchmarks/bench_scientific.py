@@ -0,0 +1,70 @@
+"""Научные функции: точные углы и кэш результатов
+
+Сравнивается прямой вызов math, функции модуля scientific (с точными
+значениями для табличных углов) и те же функции через FunctionMemo на
+двух нагрузках: таблица углов с повторами и случайные аргументы.
+
+Запуск: python benchmarks/bench_scientific.py [--calls N]
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+
+from common import ROOT
+
+sys.path.insert(0, ROOT)
+
+import scientific  # noqa: E402
+
+
+def timed(func, values):
+    start = time.perf_counter()
+    for value in values:
+        func(value)
+    return time.perf_counter() - start
+
+
+def run(calls):
+    rng = random.Random(1)
+    workloads = {
+        'table 0..359': [float(n % 360) for n in range(calls)],
+        'random': [rng.uniform(-1000, 1000) for _ in range(calls)],
+    }
+    memo = scientific.FunctionMemo(enabled=True)
+    variants = (
+        ('math.sin', lambda x: math.sin(math.radians(x))),
+        ('scientific.sin', scientific.sin),
+        ('memo sin', memo.wrap('sin', scientific.sin)),
+        ('math.log10', math.log10),
+        ('scientific.log', scientific.log),
+        ('memo log', memo.wrap('log', scientific.log)),
+    )
+    results = []
+    for workload, values in workloads.items():
+        positive = [abs(value) + 1.0 for value in values]
+        for name, func in variants:
+            memo.clear()
+            seconds = timed(func, positive if 'log' in name else values)
+            results.append({
+                'workload': workload,
+                'function': name,
+                'ns_per_call': seconds / len(values) * 1e9,
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=500000)
+    args = parser.parse_args()
+
+    print(f"{'workload':<14} {'function':<16} {'ns/call':>8}")
+    for row in run(args.calls):
+        print(f"{row['workload']:<14} {row['function']:<16} {row['ns_per_call']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Время до интерактивности: поэтапное построение против построения сразу
+
+Каждый замер идет в отдельном процессе, чтобы кэши Kivy и модулей были
+холодными. Процесс импортирует вариант приложения, создает калькулятор,
+добавляет его в окно и крутит кадры, пока StagedBuild не достроит все
+этапы. В таблице: время импорта, время от создания калькулятора до
+первого кадра с клавиатурой (интерактивность), до полного построения и
+самый долгий кадр после первого - насколько этапы мешают набору.
+
+Запуск: python benchmarks/bench_startup.py [--apps main,cyberpunk_calculator] [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from common import setup_headless
+
+APPS = ('main', 'simple_calculator', 'cyberpunk_calculator', 'final_calculator')
+# Сколько кадров крутить после полного построения
+SETTLE_FRAMES = 3
+
+
+def child(app, staged):
+    """Замер в дочернем процессе; результат - одна строка JSON"""
+    os.environ['CALCUHILL_STAGED'] = '1' if staged else '0'
+    start = time.perf_counter()
+    from kivy.base import EventLoop
+    from kivy.core.window import Window
+    module = __import__(app)
+    import_ms = (time.perf_counter() - start) * 1000.0
+
+    calculator = module.CyberpunkCalculator()
+    Window.add_widget(calculator)
+    frames = []
+    settle = SETTLE_FRAMES
+    while settle:
+        frame_start = time.perf_counter()
+        EventLoop.idle()
+        frames.append((time.perf_counter() - frame_start) * 1000.0)
+        if calculator.build_stages.done and calculator.build_stages.interactive is not None:
+            settle -= 1
+    calculator.rain_scheduler.stop()
+    calculator.history_store.close()
+
+    report = calculator.build_stages.report()
+    print(json.dumps({
+        'import_ms': import_ms,
+        'interactive_ms': report['interactive_ms'],
+        'complete_ms': max(report['complete_ms'], report['interactive_ms']),
+        'longest_frame_ms': max(frames[1:]),
+        'stages': report['stages'],
+    }))
+
+
+def measure_once(app, staged):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', app, '--staged', '1' if staged else '0'],
+        env=os.environ, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def median(values):
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+def run(apps, repeat):
+    setup_headless()
+    results = []
+    for app in apps:
+        for staged in (False, True):
+            runs = [measure_once(app, staged) for _ in range(repeat)]
+            row = {'app': app, 'staged': staged}
+            for key in ('import_ms', 'interactive_ms', 'complete_ms', 'longest_frame_ms'):
+                row[key] = median([item[key] for item in runs])
+            row['stages'] = {name: median([item['stages'][name] for item in runs]) for name in runs[0]['stages']}
+            results.append(row)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--apps', default=','.join(APPS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--staged', default='1', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        setup_headless()
+        child(args.child, args.staged == '1')
+        return
+
+    rows = run(args.apps.split(','), args.repeat)
+    print(f"{'app':<22} {'staged':<7} {'import ms':>10} {'interactive ms':>15} {'complete ms':>12} {'longest frame':>14}")
+    for row in rows:
+        print(f"{row['app']:<22} {str(row['staged']):<7} {row['import_ms']:>10.1f} {row['interactive_ms']:>15.1f} "
+              f"{row['complete_ms']:>12.1f} {row['longest_frame_ms']:>14.1f}")
+    for row in rows:
+        if row['staged']:
+            stages = ', '.join(f'{name} {ms:.1f}' for name, ms in row['stages'].items())
+            print(f"{row['app']}: этапы, мс: {stages}")
+
+
+if __name__ == '__main__':
+    main()
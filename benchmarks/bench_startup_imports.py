@@ -0,0 +1,105 @@
+"""Отчет о времени импорта при холодном старте (python -X importtime)
+
+Каждый вариант приложения импортируется в отдельном процессе с
+-X importtime; отчет разбирается, и собственное время модулей
+суммируется по группам: kivy, модули приложения, numpy и все остальное.
+Процесс запускается --repeat раз, в таблицу идет медиана. С --top
+печатаются самые дорогие модули для каждого варианта - с этого списка
+стоит начинать, если старт снова стал медленным.
+
+Запуск: python benchmarks/bench_startup_imports.py [--apps main,final_calculator] [--repeat N] [--top N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+from common import ROOT, setup_headless
+
+APPS = ('main', 'simple_calculator', 'cyberpunk_calculator', 'final_calculator')
+GROUPS = ('kivy', 'app', 'numpy', 'other')
+LOCAL_MODULES = {name[:-3] for name in os.listdir(ROOT) if name.endswith('.py')}
+
+
+def import_times(app):
+    """Собственное время импорта каждого модуля в микросекундах и общее время app"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {app}'],
+        cwd=ROOT, env=os.environ, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        modules[name] = int(self_us)
+        if name == app:
+            total = int(cumulative_us)
+    return modules, total
+
+
+def group_of(name):
+    package = name.split('.')[0]
+    if package in ('kivy', 'numpy'):
+        return package
+    if package in LOCAL_MODULES:
+        return 'app'
+    return 'other'
+
+
+def median(values):
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+def run(apps, repeat, top):
+    setup_headless()
+    results = []
+    for app in apps:
+        runs = [import_times(app) for _ in range(repeat)]
+        groups = {group: [] for group in GROUPS}
+        for modules, _ in runs:
+            sums = dict.fromkeys(GROUPS, 0)
+            for name, self_us in modules.items():
+                sums[group_of(name)] += self_us
+            for group in GROUPS:
+                groups[group].append(sums[group])
+        names = set().union(*(modules for modules, _ in runs))
+        heaviest = sorted(
+            ((median([modules.get(name, 0) for modules, _ in runs]), name) for name in names),
+            reverse=True,
+        )[:top]
+        results.append({
+            'app': app,
+            'total_ms': median([total for _, total in runs]) / 1000,
+            **{f'{group}_ms': median(groups[group]) / 1000 for group in GROUPS},
+            'numpy_loaded': all('numpy' in modules for modules, _ in runs),
+            'heaviest': [(name, us / 1000) for us, name in heaviest],
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--apps', default=','.join(APPS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=0)
+    args = parser.parse_args()
+
+    rows = run(args.apps.split(','), args.repeat, args.top)
+    print(f"{'app':<22} {'total ms':>9} {'kivy':>7} {'app':>7} {'numpy':>7} {'other':>7}  numpy loaded")
+    for row in rows:
+        print(f"{row['app']:<22} {row['total_ms']:>9.1f} {row['kivy_ms']:>7.1f} {row['app_ms']:>7.1f} "
+              f"{row['numpy_ms']:>7.1f} {row['other_ms']:>7.1f}  {row['numpy_loaded']}")
+    for row in rows:
+        if row['heaviest']:
+            print(f"\n{row['app']}: самые дорогие модули (собственное время, мс)")
+            for name, ms in row['heaviest']:
+                print(f"  {ms:>7.1f}  {name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Общие настройки бенчмарков: безоконный Kivy и путь к модулям приложения"""
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_headless():
+    """Настраиваем Kivy для запуска без экрана (вызывать до импорта kivy)"""
+    # Конфиг Kivy и журнал истории - во временном каталоге, а не у пользователя;
+    # дочерние процессы бенчмарков получают его через окружение, удаляет создавший
+    if 'KIVY_HOME' not in os.environ:
+        home = tempfile.mkdtemp(prefix='calcuhill-bench-')
+        atexit.register(shutil.rmtree, home, ignore_errors=True)
+        os.environ['KIVY_HOME'] = home
+    os.environ.setdefault('KIVY_NO_ARGS', '1')
+    os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+    os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+
+def measure(func, repeat):
+    """Вызываем func repeat раз и возвращаем время каждого вызова в мс"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return timings
+
+
+def summary(timings):
+    """Среднее и медиана по списку замеров"""
+    ordered = sorted(timings)
+    return {
+        'mean_ms': sum(ordered) / len(ordered),
+        'median_ms': ordered[len(ordered) // 2],
+    }
@@ -0,0 +1,221 @@
+"""Набор бенчмарков горячих участков с результатами в JSON
+
+Запускает без экрана бенчмарки, по которым видна регрессия: задержку от
+нажатия цифры до кадра (bench_keystroke), пропускную способность ядра
+(bench_engine), кадр MatrixRain на 20/50/500/5000 каплях
+(bench_matrix_rain), добавление в историю при растущей длине
+(bench_history), старт четырех вариантов приложения (bench_startup) и
+задержки воспроизведенных сеансов "7 × 8 + 3 =" (bench_replay).
+Каждый бенчмарк идет в отдельном процессе со своим окном Kivy; его
+run() вызывается с параметрами из SUITE, а строки результата вместе с
+коммитом, версиями и машиной пишутся в JSON (по умолчанию
+benchmarks/results/<коммит>.json). С --compare результаты сравниваются
+со старым файлом: для каждой метрики печатается изменение в процентах, а
+рост больше --threshold отмечается как регрессия, и код выхода будет 1.
+Все сравниваемые метрики - время, то есть чем меньше, тем лучше.
+
+Запуск: python benchmarks/run_all.py [--quick] [--only engine,history] [--output FILE] [--compare OLD.json]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from common import ROOT, setup_headless
+
+BENCHMARKS = os.path.join(ROOT, 'benchmarks')
+RESULTS = os.path.join(BENCHMARKS, 'results')
+
+# Имя: модуль, параметры run(), параметры для --quick, поля-ключи строки и сравниваемые метрики
+SUITE = {
+    'keystroke': {
+        'module': 'bench_keystroke',
+        'params': {'apps': ['main', 'simple_calculator', 'cyberpunk_calculator', 'final_calculator'],
+                   'presses': 500, 'digits': 8},
+        'quick': {'presses': 100},
+        'keys': ('app',),
+        'metrics': ('add_number_us', 'press_to_display_median_ms', 'press_to_display_p95_ms'),
+    },
+    'engine': {
+        'module': 'bench_engine',
+        'params': {'ops': 2000000},
+        'quick': {'ops': 200000},
+        'keys': ('case',),
+        'metrics': ('ns_per_op',),
+    },
+    'matrix_rain': {
+        'module': 'bench_matrix_rain',
+        'params': {'frames': 300, 'drop_counts': [20, 50, 500, 5000]},
+        'quick': {'frames': 50},
+        'keys': ('renderer', 'drops'),
+        'metrics': ('update_ms', 'frame_ms'),
+    },
+    'history': {
+        'module': 'bench_history',
+        'params': {'sizes': [0, 1000, 10000, 100000], 'repeat': 50, 'legacy_max': 2000},
+        'quick': {'repeat': 10, 'legacy_max': 1000},
+        'keys': ('panel', 'entries'),
+        'metrics': ('append_frame_median_ms',),
+    },
+    'startup': {
+        'module': 'bench_startup',
+        'params': {'apps': ['main', 'simple_calculator', 'cyberpunk_calculator', 'final_calculator'],
+                   'repeat': 5},
+        'quick': {'repeat': 1},
+        'keys': ('app', 'staged'),
+        'metrics': ('import_ms', 'interactive_ms', 'complete_ms'),
+    },
+    'replay': {
+        'module': 'bench_replay',
+        'params': {'apps': ['main', 'simple_calculator', 'cyberpunk_calculator', 'final_calculator'],
+                   'sessions': [['7', '×', '8', '+', '3', '=']] * 200, 'gap_frames': 1},
+        'quick': {'sessions': [['7', '×', '8', '+', '3', '=']] * 30},
+        'keys': ('app', 'kind'),
+        'metrics': ('median_ms', 'p95_ms', 'record_median_ms'),
+    },
+}
+
+
+def child(name, params):
+    """Бенчмарк в дочернем процессе; результат - строки run() одной строкой JSON"""
+    setup_headless()
+    sys.path.insert(0, BENCHMARKS)
+    module = __import__(SUITE[name]['module'])
+    print(json.dumps(module.run(**params)))
+
+
+def run_benchmark(name, params):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', name, '--params', json.dumps(params)],
+        cwd=BENCHMARKS, env=os.environ, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'{name} failed:\n{result.stderr}')
+    return {
+        'params': params,
+        'seconds': time.perf_counter() - start,
+        'rows': json.loads(result.stdout.strip().splitlines()[-1]),
+    }
+
+
+def git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def module_version(name):
+    try:
+        return __import__(name).__version__
+    except ImportError:
+        return None
+
+
+def environment():
+    """Коммит, версии и машина, на которой получены результаты"""
+    return {
+        'commit': git('rev-parse', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'kivy': module_version('kivy'),
+        'numpy': module_version('numpy'),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'env': {key: value for key, value in os.environ.items() if key.startswith('CALCUHILL_')},
+    }
+
+
+def run(names, quick):
+    setup_headless()
+    report = {'environment': environment(), 'quick': quick, 'benchmarks': {}}
+    for name in names:
+        params = dict(SUITE[name]['params'])
+        if quick:
+            params.update(SUITE[name]['quick'])
+        report['benchmarks'][name] = run_benchmark(name, params)
+    return report
+
+
+def row_key(row, keys):
+    return ' '.join(f'{key}={row[key]}' for key in keys)
+
+
+def compare(base, current, threshold):
+    """Строки сравнения по общим бенчмаркам и метрикам; последнее поле - признак регрессии"""
+    lines = []
+    for name, result in current['benchmarks'].items():
+        if name not in base['benchmarks']:
+            continue
+        spec = SUITE[name]
+        base_rows = {row_key(row, spec['keys']): row for row in base['benchmarks'][name]['rows']}
+        for row in result['rows']:
+            key = row_key(row, spec['keys'])
+            old = base_rows.get(key)
+            if old is None:
+                continue
+            for metric in spec['metrics']:
+                if not old.get(metric) or row.get(metric) is None:
+                    continue
+                change = (row[metric] - old[metric]) / old[metric] * 100.0
+                lines.append((name, key, metric, old[metric], row[metric], change, change > threshold))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', default=','.join(SUITE))
+    parser.add_argument('--quick', action='store_true')
+    parser.add_argument('--output')
+    parser.add_argument('--compare')
+    parser.add_argument('--threshold', type=float, default=10.0)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--params', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, json.loads(args.params))
+        return
+
+    names = args.only.split(',')
+    unknown = [name for name in names if name not in SUITE]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    report = run(names, args.quick)
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS, exist_ok=True)
+        commit = (report['environment']['commit'] or 'nogit')[:12]
+        output = os.path.join(RESULTS, f"{commit}{'-dirty' if report['environment']['dirty'] else ''}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"{'benchmark':<12} {'rows':>5} {'seconds':>8}")
+    for name, result in report['benchmarks'].items():
+        print(f"{name:<12} {len(result['rows']):>5} {result['seconds']:>8.1f}")
+    print(f'\nрезультаты: {output}')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            base = json.load(f)
+        lines = compare(base, report, args.threshold)
+        print(f"\nсравнение с {base['environment']['commit'] or args.compare}\n")
+        print(f"{'benchmark':<12} {'row':<34} {'metric':<27} {'before':>10} {'after':>10} {'change':>8}")
+        for name, key, metric, old, new, change, regressed in lines:
+            print(f"{name:<12} {key:<34} {metric:<27} {old:>10.3f} {new:>10.3f} {change:>+7.1f}%"
+                  + ('  регрессия' if regressed else ''))
+        if any(line[-1] for line in lines):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
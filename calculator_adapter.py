@@ -0,0 +1,108 @@
+from calculator_engine import CalculatorEngine
+
+
+class CalculatorAdapter:
+    """Примесь CyberpunkCalculator: кнопки, дисплей и история поверх CalculatorEngine"""
+
+    # Виджет задает display, build_stages с этапом 'history' (build_history) и
+    # вызывает init_engine в __init__. Методы кнопок принимают необязательный
+    # instance, поэтому их можно привязывать к on_press.
+
+    # Класс панели истории со стилем приложения
+    history_panel_class = None
+
+    def init_engine(self):
+        self.engine = CalculatorEngine(on_result=self.record_history)
+
+    def build_history(self):
+        """Панель истории: журнал на диске и последние записи в панели"""
+        # Журнал (json, threading, datetime) импортируется вместе с панелью, а не при старте
+        from history_store import HistoryStore
+        self.history_panel = self.history_panel_class()
+        self.history_store = HistoryStore()
+        self.history = self.history_store.load_recent()
+        self.history_panel.load_history(self.history)
+        return self.history_panel
+
+    def refresh_display(self):
+        """Показываем на дисплее состояние ядра"""
+        self.display.result_text = self.engine.result_text
+        self.display.expression_text = self.engine.expression_text
+
+    def record_history(self, expression, result):
+        """Сохраняем вычисление в журнал и показываем в панели истории"""
+        # Вычисление могло случиться раньше, чем достроилась панель истории
+        self.build_stages.finish('history')
+        self.history.append(self.history_store.append(expression, result))
+        self.history_panel.add_history_item(expression, result)
+
+    def add_number(self, number, instance=None):
+        """Добавляем цифру"""
+        self.engine.add_number(number)
+        self.refresh_display()
+
+    def backspace(self, instance=None):
+        """Стираем последний введенный символ"""
+        self.engine.backspace()
+        self.refresh_display()
+
+    def clear(self, instance=None):
+        """Очищаем калькулятор"""
+        self.engine.clear()
+        self.refresh_display()
+
+    def negate(self, instance=None):
+        """Меняем знак числа"""
+        self.engine.negate()
+        self.refresh_display()
+
+    def percentage(self, instance=None):
+        """Процент от числа"""
+        self.engine.percentage()
+        self.refresh_display()
+
+    def set_operation(self, op, instance=None):
+        """Устанавливаем операцию"""
+        self.engine.set_operation(op)
+        self.refresh_display()
+
+    def calculate(self, instance=None):
+        """Выполняем вычисление"""
+        self.engine.calculate()
+        self.refresh_display()
+
+    def sin(self, instance=None):
+        """Синус числа"""
+        self.engine.sin()
+        self.refresh_display()
+
+    def apply_function(self, name, instance=None):
+        """Научная функция из реестра по имени"""
+        self.engine.apply_function(name)
+        self.refresh_display()
+
+
+class CalculatorAppMixin:
+    """Примесь App: пауза и выход для корневого CyberpunkCalculator"""
+
+    def on_pause(self):
+        """Останавливаем анимацию, пока приложение свернуто"""
+        root = self.root
+        # Дождь мог еще не построиться: строить его ради паузы незачем
+        rain_scheduler = getattr(root, 'rain_scheduler', None)
+        if rain_scheduler is not None:
+            rain_scheduler.pause()
+        root.build_stages.finish('history')
+        root.history_store.flush()
+        return True
+
+    def on_resume(self):
+        """Возобновляем анимацию после возврата в приложение"""
+        rain_scheduler = getattr(self.root, 'rain_scheduler', None)
+        if rain_scheduler is not None:
+            rain_scheduler.resume()
+
+    def on_stop(self):
+        """Дописываем историю на диск перед выходом"""
+        self.root.build_stages.finish('history')
+        self.root.history_store.close()
@@ -0,0 +1,151 @@
+from expression import apply_operator, compile_expression
+from input_buffer import InputBuffer
+from numeric import display_expression, display_text, get_backend
+from profiler import profiled
+from scientific import OPERATIONS
+
+ERROR_TEXT = 'Ошибка'
+OPERATION_SYMBOLS = {'+': '+', '-': '-', '*': '×', '/': '÷'}
+
+
+class CalculatorEngine:
+    """Состояние калькулятора без Kivy; интерфейс подключается через CalculatorAdapter"""
+
+    __slots__ = (
+        'buffer', 'error', 'pending', 'new_number',
+        'expression_text', 'on_result', 'backend',
+    )
+
+    def __init__(self, on_result=None, backend=None):
+        # on_result(expression, result) после каждого успешного вычисления: так интерфейс ведет историю
+        self.on_result = on_result
+        # Тип чисел (float, decimal, fraction); по умолчанию из CALCUHILL_NUMERIC
+        self.backend = backend or get_backend()
+        # Текст набираемого числа собирается, только когда дисплей читает result_text
+        self.buffer = InputBuffer()
+        self.clear()
+
+    @property
+    def current_number(self):
+        return self.buffer.text
+
+    @property
+    def result_text(self):
+        # Буфер хранит результат целиком для следующих операций и истории,
+        # дисплей получает его сокращенным до DISPLAY_LENGTH символов
+        return ERROR_TEXT if self.error else display_text(self.buffer.text)
+
+    def add_number(self, number):
+        """Добавляем цифру"""
+        if self.new_number:
+            self.buffer.clear()
+            self.new_number = False
+        self.buffer.append(number)
+        self.error = False
+
+    def backspace(self):
+        """Стираем последний введенный символ"""
+        if not self.new_number:
+            self.buffer.backspace()
+            self.error = False
+
+    def clear(self):
+        """Очищаем калькулятор"""
+        self.buffer.clear()
+        self.error = False
+        # Операции копятся здесь и вычисляются по '=' с учетом приоритетов: 2 + 3 × 4 = 14
+        self.pending = []
+        self.new_number = True
+        self.expression_text = ''
+
+    def negate(self):
+        """Меняем знак числа"""
+        if not self.buffer.is_zero_literal():
+            self.buffer.negate()
+            self.error = False
+
+    def percentage(self):
+        """Процент от числа"""
+        backend = self.backend
+        try:
+            value = backend.evaluate(apply_operator, '/', backend.parse(self.buffer.number_text()), 100)
+            self.buffer.load(backend.format(value))
+            self.error = False
+        except (ValueError, ArithmeticError):
+            pass
+
+    def set_operation(self, op):
+        """Добавляем число и операцию к выражению"""
+        if self.new_number and self.pending:
+            # Повторное нажатие операции заменяет предыдущую
+            self.pending[-1] = op
+        else:
+            backend = self.backend
+            try:
+                # Слишком длинное число может не разобраться (предел длины целого в Python)
+                number = backend.literal(backend.parse(self.buffer.number_text()))
+            except (ValueError, ArithmeticError):
+                self.fail()
+                return
+            self.pending += [number, op]
+        self.new_number = True
+
+        # Показываем выражение
+        self.expression_text = display_expression(
+            ' '.join(OPERATION_SYMBOLS.get(token, token) for token in self.pending))
+
+    @profiled('calculate')
+    def calculate(self):
+        """Выполняем вычисление; возвращаем (выражение, результат) или None"""
+        if not self.pending:
+            return None
+
+        backend = self.backend
+        try:
+            expression = ' '.join(self.pending + [backend.literal(backend.parse(self.buffer.number_text()))])
+            result = backend.coerce(compile_expression(expression, backend).evaluate())
+            # Огромное целое может не превратиться в строку
+            result_text = backend.format(result)
+        except (ValueError, ArithmeticError):
+            self.fail()
+            return None
+
+        self.buffer.load(result_text)
+        self.error = False
+        self.expression_text = ''
+        self.pending = []
+        self.new_number = True
+
+        if self.on_result is not None:
+            self.on_result(expression, result_text)
+        return expression, result_text
+
+    def fail(self):
+        """Показываем 'Ошибка' и начинаем выражение заново, как после успешного '='"""
+        self.buffer.clear()
+        self.error = True
+        self.expression_text = ''
+        self.pending = []
+        self.new_number = True
+
+    def apply_function(self, name):
+        """Применяем научную функцию из реестра к текущему числу"""
+        operation = OPERATIONS[name]
+        backend = self.backend
+        try:
+            if operation.arity:
+                value = backend.evaluate(operation, backend.parse(self.buffer.number_text()))
+            else:
+                value = operation()
+            result_text = backend.format(backend.coerce(value))
+        except (ValueError, ArithmeticError):
+            self.error = True
+            return
+        self.buffer.load(result_text)
+        self.error = False
+        # Следующая цифра начинает новое число, а не дописывается к результату
+        self.new_number = True
+
+    def sin(self):
+        """Синус числа"""
+        self.apply_function('sin')
@@ -0,0 +1,119 @@
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.widget import Widget
+from kivy.animation import Animation
+from kivy.properties import NumericProperty
+from kivy.graphics import Canvas, Fbo, Callback, Color, Rectangle, Translate, ClearColor, ClearBuffers
+from kivy.graphics.opengl import (
+    glBlendFunc, glBlendFuncSeparate, GL_ONE, GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA
+)
+import os
+
+
+def _blend_premultiplied_into(instruction):
+    # Внутри Fbo копим цвет с предумноженной альфой, иначе края текста темнеют
+    glBlendFuncSeparate(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+
+
+def _blend_premultiplied(instruction):
+    glBlendFunc(GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+
+
+def _blend_default(instruction):
+    glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+
+class PressShade(Widget):
+    """Затемнение поверх нажатой кнопки"""
+
+    shade = NumericProperty(0)
+
+    def __init__(self, color, **kwargs):
+        super().__init__(**kwargs)
+        with self.canvas:
+            self.color = Color(*color, 0)
+            self.rect = Rectangle()
+        self.bind(shade=self.update_shade)
+
+    def update_shade(self, instance, value):
+        self.color.a = value
+
+
+class ChromeCache(BoxLayout):
+    """Панель, которая рисует своих детей один раз в Fbo"""
+
+    # Любое изменение внутри Fbo перерисовывает его целиком, поэтому в кэш кладется
+    # только статичное оформление (клавиатура), а дисплей и анимации остаются снаружи:
+    # нажатие показывается затемнением поверх Fbo (shade_press), а не прозрачностью кнопки
+    shade_color = (0.05, 0.06, 0.09)
+    shade_depth = 0.4
+    shade_in = 0.1
+    shade_out = 0.2
+
+    def __init__(self, **kwargs):
+        # Пока дети не меняются, Fbo не перерисовывается и на экран выводится один
+        # прямоугольник; при смене темы нужно вызвать invalidate
+        self.cached = kwargs.pop('cached', os.environ.get('CALCUHILL_CHROME_CACHE', '1') != '0')
+        self.shades = {}
+        if self.cached:
+            self.canvas = Canvas()
+            with self.canvas:
+                self.fbo = Fbo(size=(1, 1))
+                Callback(_blend_premultiplied)
+                Color(1, 1, 1, 1)
+                self.fbo_rect = Rectangle(texture=self.fbo.texture)
+                Callback(_blend_default)
+            with self.fbo:
+                ClearColor(0, 0, 0, 0)
+                ClearBuffers()
+                Callback(_blend_premultiplied_into)
+                self.fbo_translate = Translate(0, 0)
+        super().__init__(**kwargs)
+
+    def add_widget(self, widget, *args, **kwargs):
+        if not self.cached:
+            return super().add_widget(widget, *args, **kwargs)
+        canvas = self.canvas
+        self.canvas = self.fbo
+        try:
+            return super().add_widget(widget, *args, **kwargs)
+        finally:
+            self.canvas = canvas
+
+    def remove_widget(self, widget, *args, **kwargs):
+        if not self.cached:
+            return super().remove_widget(widget, *args, **kwargs)
+        canvas = self.canvas
+        self.canvas = self.fbo
+        try:
+            return super().remove_widget(widget, *args, **kwargs)
+        finally:
+            self.canvas = canvas
+
+    def on_size(self, instance, value):
+        if self.cached:
+            self.fbo.size = (max(1, int(value[0])), max(1, int(value[1])))
+            self.fbo_rect.texture = self.fbo.texture
+            self.fbo_rect.size = value
+
+    def on_pos(self, instance, value):
+        if self.cached:
+            self.fbo_rect.pos = value
+            # Дети расположены в координатах окна, а Fbo начинается с нуля
+            self.fbo_translate.xy = (-value[0], -value[1])
+
+    def shade_press(self, widget):
+        """Мигание нажатого виджета поверх кэша, без перерисовки Fbo"""
+        shade = self.shades.get(widget)
+        if shade is None:
+            shade = self.shades[widget] = PressShade(self.shade_color)
+            self.canvas.after.add(shade.canvas)
+        shade.rect.pos = widget.pos
+        shade.rect.size = widget.size
+        Animation.cancel_all(shade)
+        anim = Animation(shade=self.shade_depth, duration=self.shade_in) + Animation(shade=0, duration=self.shade_out)
+        anim.start(shade)
+
+    def invalidate(self):
+        """Перерисовываем кэш (например, после смены темы)"""
+        if self.cached:
+            self.fbo.ask_update()
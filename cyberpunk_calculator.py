@@ -5,100 +5,89 @@ from kivy.uix.button import Button
 from kivy.uix.label import Label
 from kivy.uix.widget import Widget
 from kivy.core.window import Window
-from kivy.clock import Clock
 from kivy.animation import Animation
-from kivy.properties import NumericProperty, StringProperty, ListProperty, BooleanProperty
+from kivy.properties import NumericProperty, ListProperty
 from kivy.metrics import dp
-from kivy.graphics import Color, Rectangle, RoundedRectangle, Line, Ellipse
+from kivy.graphics import Color, BorderImage, PushMatrix, PopMatrix, Scale
 from kivy.graphics.texture import Texture
-from kivy.core.text import LabelBase
 from kivy.resources import resource_add_path
-from kivy.uix.scrollview import ScrollView
-from kivy.uix.popup import Popup
-from kivy.uix.modalview import ModalView
+from matrix_rain import MatrixRain as BaseMatrixRain, RainScheduler
+from display import CyberpunkDisplay as BaseCyberpunkDisplay
+from history_panel import HistoryPanel as BaseHistoryPanel, HistoryItem as BaseHistoryItem
+from calculator_adapter import CalculatorAdapter, CalculatorAppMixin
+from staged_build import StagedBuild
+from profiler import profiled
 import math
-import random
-import json
-from datetime import datetime
 
 # Регистрируем кастомные шрифты
 resource_add_path('fonts')
 
+# Ширина размытого края общей текстуры свечения в пикселях
+GLOW_BORDER = 16
+_glow_texture = None
+
+def get_glow_texture():
+    """Общая заранее размытая текстура свечения (белая, с мягким краем)"""
+    global _glow_texture
+    if _glow_texture is None:
+        size = GLOW_BORDER * 2 + 2
+        pixels = bytearray()
+        for y in range(size):
+            for x in range(size):
+                dx = max(GLOW_BORDER - x, x - (size - 1 - GLOW_BORDER), 0)
+                dy = max(GLOW_BORDER - y, y - (size - 1 - GLOW_BORDER), 0)
+                alpha = max(0.0, 1.0 - math.hypot(dx, dy) / GLOW_BORDER) ** 2
+                pixels += bytes((255, 255, 255, int(alpha * 255)))
+        _glow_texture = Texture.create(size=(size, size), colorfmt='rgba')
+        _glow_texture.blit_buffer(bytes(pixels), colorfmt='rgba', bufferfmt='ubyte')
+    return _glow_texture
+
 class NeonEffect(Widget):
     """Неоновый эффект для кнопок"""
     
+    # Меняет только прозрачность общей размытой текстуры: анимация не перестраивает canvas
+    glow_intensity = NumericProperty(0.0)
+    glow_color = ListProperty([0, 1, 1])
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.glow_intensity = 0.0
+        with self.canvas.before:
+            self.glow_color_instruction = Color(*self.glow_color, 0)
+            self.glow_image = BorderImage(
+                texture=get_glow_texture(),
+                border=(GLOW_BORDER, GLOW_BORDER, GLOW_BORDER, GLOW_BORDER)
+            )
         self.bind(pos=self.update_glow, size=self.update_glow)
+        self.update_glow()
         
     def update_glow(self, *args):
-        self.canvas.clear()
-        with self.canvas:
-            # Внешнее свечение
-            Color(0, 1, 1, self.glow_intensity * 0.3)
-            RoundedRectangle(
-                pos=(self.x - 5, self.y - 5),
-                size=(self.width + 10, self.height + 10),
-                radius=[10,]
-            )
-            # Внутреннее свечение
-            Color(0, 1, 1, self.glow_intensity * 0.6)
-            RoundedRectangle(
-                pos=(self.x - 2, self.y - 2),
-                size=(self.width + 4, self.height + 4),
-                radius=[8,]
-            )
-
-class MatrixRain(Widget):
-    """Улучшенный матричный дождь с японскими символами"""
+        """Подгоняем свечение под размер виджета"""
+        margin = GLOW_BORDER / 2
+        self.glow_image.pos = (self.x - margin, self.y - margin)
+        self.glow_image.size = (self.width + margin * 2, self.height + margin * 2)
     
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.chars = "01アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワヲン"
-        self.drops = []
-        self.create_drops()
-        
-    def create_drops(self):
-        """Создаем капли матричного дождя"""
-        for i in range(30):
-            x = random.randint(0, int(Window.width))
-            y = random.randint(0, int(Window.height))
-            speed = random.uniform(0.5, 2.0)
-            length = random.randint(3, 12)
-            brightness = random.uniform(0.1, 0.8)
-            self.drops.append({
-                'x': x, 'y': y, 'speed': speed, 'length': length,
-                'brightness': brightness,
-                'chars': [random.choice(self.chars) for _ in range(length)]
-            })
+    def on_glow_intensity(self, instance, value):
+        self.glow_color_instruction.a = value * 0.6
     
-    def update(self, dt):
-        """Обновляем позиции капель"""
-        for drop in self.drops:
-            drop['y'] -= drop['speed']
-            if drop['y'] < -100:
-                drop['y'] = Window.height + 100
-                drop['x'] = random.randint(0, int(Window.width))
-                drop['brightness'] = random.uniform(0.1, 0.8)
-        self.canvas.clear()
-        self.draw()
+    def on_glow_color(self, instance, value):
+        self.glow_color_instruction.rgb = value
+
+class MatrixRain(BaseMatrixRain):
+    """Улучшенный матричный дождь с японскими символами"""
     
-    def draw(self):
-        """Отрисовываем матричный дождь"""
-        with self.canvas:
-            for drop in self.drops:
-                for i, char in enumerate(drop['chars']):
-                    alpha = (1.0 - (i / len(drop['chars']))) * drop['brightness'] * 0.4
-                    Color(0, 1, 0, alpha)
-                    Rectangle(
-                        pos=(drop['x'], drop['y'] - i * 18),
-                        size=(16, 16)
-                    )
+    drop_count = 30
+    speed_range = (0.5, 2.0)
+    length_range = (3, 12)
+    brightness_range = (0.1, 0.8)
+    alpha_scale = 0.4
+    char_step = 18
+    char_size = 16
 
-class CyberpunkButton(Button):
+class CyberpunkButton(NeonEffect, Button):
     """Киберпанк кнопка с неоновым свечением и анимациями"""
     
+    scale = NumericProperty(1.0)
+    
     def __init__(self, text="", color_scheme="cyan", **kwargs):
         super().__init__(**kwargs)
         self.text = text
@@ -106,7 +95,6 @@ class CyberpunkButton(Button):
         self.background_color = (0, 0, 0, 0)
         self.font_size = dp(18)
         self.size_hint = (1, 1)
-        self.glow_intensity = 0.0
         
         # Устанавливаем цвет в зависимости от схемы
         if color_scheme == "cyan":
@@ -117,12 +105,25 @@ class CyberpunkButton(Button):
             self.color = (0, 1, 0, 1)
         else:
             self.color = (0, 1, 1, 1)
+        self.glow_color = self.color[:3]
+        
+        # Масштаб нажатия применяется матрицей вокруг всей кнопки
+        self.scale_instruction = Scale(1.0)
+        self.canvas.before.insert(0, PushMatrix())
+        self.canvas.before.insert(1, self.scale_instruction)
+        self.canvas.after.add(PopMatrix())
         
         self.bind(on_press=self.on_button_press)
         self.bind(on_release=self.on_button_release)
+    
+    def on_scale(self, instance, value):
+        self.scale_instruction.origin = self.center
+        self.scale_instruction.xyz = (value, value, 1.0)
         
     def on_button_press(self, instance):
         """Анимация нажатия с неоновым свечением"""
+        Animation.cancel_all(self, 'scale', 'glow_intensity')
+        
         # Анимация масштаба
         anim = Animation(scale=1.2, duration=0.1) + Animation(scale=1.0, duration=0.1)
         anim.start(self)
@@ -142,58 +143,17 @@ class GradientLabel(Label):
         super().__init__(**kwargs)
         self.gradient_colors = [(0, 1, 1, 1), (1, 0, 1, 1)]  # Голубой к розовому
 
-class CyberpunkDisplay(BoxLayout):
+class CyberpunkDisplay(BaseCyberpunkDisplay):
     """Киберпанк дисплей с градиентным текстом и анимациями"""
     
-    result_text = StringProperty('0')
-    expression_text = StringProperty('')
-    
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.orientation = 'vertical'
-        self.padding = dp(20)
-        self.spacing = dp(10)
-        
-        # Поле выражения
-        self.expression_label = Label(
-            text='',
-            color=(0.5, 0.5, 0.5, 1),
-            font_size=dp(16),
-            size_hint_y=None,
-            height=dp(30),
-            halign='right'
-        )
-        self.add_widget(self.expression_label)
-        
-        # Поле результата
-        self.result_label = Label(
-            text='0',
-            color=(0, 1, 1, 1),
-            font_size=dp(32),
-            size_hint_y=None,
-            height=dp(50),
-            halign='right',
-            bold=True
-        )
-        self.add_widget(self.result_label)
-        
-        self.bind(result_text=self.update_result)
-        self.bind(expression_text=self.update_expression)
-    
-    def update_result(self, instance, value):
-        """Обновляем результат с анимацией"""
-        # Анимация изменения текста
-        anim = Animation(opacity=0.5, duration=0.1) + Animation(opacity=1.0, duration=0.1)
-        anim.start(self.result_label)
-        self.result_label.text = value
-    
-    def update_expression(self, instance, value):
-        """Обновляем выражение"""
-        self.expression_label.text = value
+    pulse_opacity = 0.5
 
 class ScientificPanel(BoxLayout):
     """Панель научных функций"""
     
+    # Кнопки сообщают имя операции из реестра scientific.OPERATIONS
+    __events__ = ('on_function',)
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.orientation = 'vertical'
@@ -236,80 +196,35 @@ class ScientificPanel(BoxLayout):
     
     def on_function_press(self, function):
         """Обработка нажатия научной функции"""
-        # Здесь будет логика для научных функций
+        self.dispatch('on_function', function)
+    
+    def on_function(self, function):
         pass
 
-class HistoryPanel(BoxLayout):
-    """Улучшенная панель истории вычислений"""
+class HistoryItem(BaseHistoryItem):
+    """Строка истории"""
     
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.orientation = 'vertical'
-        self.size_hint_x = 0.8
-        self.pos_hint = {'right': 1}
-        self.background_color = (0.1, 0.1, 0.15, 0.9)
-        
-        # Заголовок
-        title = Label(
-            text='История вычислений',
-            color=(0, 1, 1, 1),
-            font_size=dp(20),
-            size_hint_y=None,
-            height=dp(40)
-        )
-        self.add_widget(title)
-        
-        # Список истории
-        self.history_list = GridLayout(
-            cols=1,
-            spacing=dp(5),
-            size_hint_y=None
-        )
-        self.history_list.bind(minimum_height=self.history_list.setter('height'))
-        
-        scroll = ScrollView(size_hint=(1, 1))
-        scroll.add_widget(self.history_list)
-        self.add_widget(scroll)
+    appear_duration = 0.3
+
+class HistoryPanel(BaseHistoryPanel):
+    """Улучшенная панель истории вычислений"""
     
-    def add_history_item(self, expression, result):
-        """Добавляем элемент в историю с анимацией"""
-        item = BoxLayout(orientation='vertical', size_hint_y=None, height=dp(60))
-        
-        expr_label = Label(
-            text=expression,
-            color=(0.7, 0.7, 0.7, 1),
-            font_size=dp(14),
-            halign='left'
-        )
-        result_label = Label(
-            text=f'= {result}',
-            color=(0, 1, 1, 1),
-            font_size=dp(16),
-            halign='right',
-            bold=True
-        )
-        
-        item.add_widget(expr_label)
-        item.add_widget(result_label)
-        
-        # Анимация появления
-        item.opacity = 0
-        anim = Animation(opacity=1, duration=0.3)
-        anim.start(item)
-        
-        self.history_list.add_widget(item)
+    title_text = 'История вычислений'
+    item_class = HistoryItem
 
-class CyberpunkCalculator(BoxLayout):
+class CyberpunkCalculator(CalculatorAdapter, BoxLayout):
     """Основной класс киберпанк калькулятора"""
     
+    history_panel_class = HistoryPanel
+    
     def __init__(self, **kwargs):
+        self.build_stages = StagedBuild(kwargs.pop('staged', None))
         super().__init__(**kwargs)
         self.orientation = 'horizontal'
         self.background_color = (0.05, 0.06, 0.09, 1)  # Темный фон
         
-        # Матричный дождь
-        self.matrix_rain = MatrixRain()
-        self.add_widget(self.matrix_rain)
+        # Место под матричный дождь: он строится уже после первого кадра
+        rain_slot = self.build_stages.reserve(self)
         
         # Основная панель калькулятора
         main_panel = BoxLayout(orientation='vertical', size_hint_x=0.7)
@@ -323,20 +238,33 @@ class CyberpunkCalculator(BoxLayout):
         
         self.add_widget(main_panel)
         
-        # Панель истории
-        self.history_panel = HistoryPanel()
-        self.add_widget(self.history_panel)
+        # Научная панель и история тоже достраиваются после первого кадра; места - по размеру панелей
+        scientific_slot = self.build_stages.reserve(self, size_hint_x=0.3)
+        history_slot = self.build_stages.reserve(self, size_hint_x=0.8)
         
-        # Переменные калькулятора
-        self.current_number = '0'
-        self.previous_number = None
-        self.operation = None
-        self.new_number = True
-        self.history = []
+        # Вычислительное ядро
+        self.init_engine()
         
-        # Запускаем анимацию матричного дождя
-        Clock.schedule_interval(self.matrix_rain.update, 1.0/60.0)
+        # Дисплей и клавиатура видны на первом кадре, остальное - на следующих
+        self.build_stages.add('history', self.build_history, history_slot)
+        self.build_stages.add('scientific panel', self.build_scientific_panel, scientific_slot)
+        self.build_stages.add('matrix rain', self.build_rain, rain_slot)
+        self.build_stages.start()
+    
+    def build_scientific_panel(self):
+        """Панель научных функций"""
+        self.scientific_panel = ScientificPanel()
+        self.scientific_panel.bind(on_function=lambda panel, name: self.apply_function(name))
+        return self.scientific_panel
     
+    def build_rain(self):
+        """Матричный дождь и его анимация"""
+        self.matrix_rain = MatrixRain()
+        self.rain_scheduler = RainScheduler(self.matrix_rain, fps=60)
+        self.rain_scheduler.start()
+        return self.matrix_rain
+    
+    @profiled('create_buttons')
     def create_buttons(self, parent):
         """Создаем кнопки калькулятора с разными цветовыми схемами"""
         button_layout = GridLayout(cols=4, spacing=dp(5), padding=dp(10))
@@ -365,112 +293,17 @@ class CyberpunkCalculator(BoxLayout):
             ('=', self.calculate, "green"),
         ]
         
+        # Кнопки по надписи: через них нажатия можно воспроизводить без экрана
+        self.buttons = {}
         for text, callback, color_scheme in buttons:
             btn = CyberpunkButton(text=text, color_scheme=color_scheme)
             btn.bind(on_press=callback)
+            self.buttons[text] = btn
             button_layout.add_widget(btn)
         
         parent.add_widget(button_layout)
-    
-    def add_number(self, number):
-        """Добавляем цифру"""
-        if self.new_number:
-            self.current_number = number
-            self.new_number = False
-        else:
-            if number == '.' and '.' not in self.current_number:
-                self.current_number += number
-            elif number != '.':
-                self.current_number += number
-        
-        self.display.result_text = self.current_number
-    
-    def clear(self):
-        """Очищаем калькулятор"""
-        self.current_number = '0'
-        self.previous_number = None
-        self.operation = None
-        self.new_number = True
-        self.display.result_text = '0'
-        self.display.expression_text = ''
-    
-    def negate(self):
-        """Меняем знак числа"""
-        if self.current_number != '0':
-            if self.current_number.startswith('-'):
-                self.current_number = self.current_number[1:]
-            else:
-                self.current_number = '-' + self.current_number
-            self.display.result_text = self.current_number
-    
-    def percentage(self):
-        """Процент от числа"""
-        try:
-            value = float(self.current_number) / 100
-            self.current_number = str(value)
-            self.display.result_text = self.current_number
-        except ValueError:
-            pass
-    
-    def set_operation(self, op):
-        """Устанавливаем операцию"""
-        if self.previous_number is not None:
-            self.calculate()
-        
-        self.previous_number = float(self.current_number)
-        self.operation = op
-        self.new_number = True
-        
-        # Показываем выражение
-        op_symbol = {'+': '+', '-': '-', '*': '×', '/': '÷'}.get(op, op)
-        self.display.expression_text = f"{self.previous_number} {op_symbol}"
-    
-    def calculate(self):
-        """Выполняем вычисление"""
-        if self.previous_number is None or self.operation is None:
-            return
-        
-        try:
-            current = float(self.current_number)
-            previous = self.previous_number
-            op = self.operation
-            
-            if op == '+':
-                result = previous + current
-            elif op == '-':
-                result = previous - current
-            elif op == '*':
-                result = previous * current
-            elif op == '/':
-                if current == 0:
-                    self.display.result_text = 'Ошибка'
-                    return
-                result = previous / current
-            
-            # Добавляем в историю
-            expression = f"{previous} {self.operation} {current}"
-            self.history_panel.add_history_item(expression, str(result))
-            
-            self.current_number = str(result)
-            self.display.result_text = self.current_number
-            self.display.expression_text = ''
-            self.previous_number = None
-            self.operation = None
-            self.new_number = True
-            
-        except ValueError:
-            self.display.result_text = 'Ошибка'
-    
-    def sin(self):
-        """Синус числа"""
-        try:
-            value = math.sin(math.radians(float(self.current_number)))
-            self.current_number = str(value)
-            self.display.result_text = self.current_number
-        except ValueError:
-            pass
 
-class CyberpunkCalculatorApp(App):
+class CyberpunkCalculatorApp(CalculatorAppMixin, App):
     """Главное приложение"""
     
     def build(self):
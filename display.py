@@ -0,0 +1,82 @@
+from kivy.animation import Animation
+from kivy.clock import Clock
+from kivy.metrics import dp
+from kivy.properties import StringProperty
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.label import Label
+
+
+class CyberpunkDisplay(BoxLayout):
+    """Дисплей калькулятора: строка выражения и результат"""
+
+    result_text = StringProperty('0')
+    expression_text = StringProperty('')
+
+    # Варианты приложения настраивают оформление через атрибуты класса
+    display_padding = 20
+    display_spacing = 10
+    expression_color = (0.5, 0.5, 0.5, 1)
+    expression_font_size = 16
+    expression_height = 30
+    result_font_size = 32
+    result_height = 50
+    # Прозрачность в середине мигания при смене результата; None - без мигания
+    pulse_opacity = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.orientation = 'vertical'
+        self.padding = dp(self.display_padding)
+        self.spacing = dp(self.display_spacing)
+
+        # Поле выражения
+        self.expression_label = Label(
+            text='',
+            color=self.expression_color,
+            font_size=dp(self.expression_font_size),
+            size_hint_y=None,
+            height=dp(self.expression_height),
+            halign='right'
+        )
+        self.add_widget(self.expression_label)
+
+        # Поле результата
+        self.result_label = Label(
+            text='0',
+            color=(0, 1, 1, 1),
+            font_size=dp(self.result_font_size),
+            size_hint_y=None,
+            height=dp(self.result_height),
+            halign='right',
+            bold=True
+        )
+        self.add_widget(self.result_label)
+
+        # Изменения result_text за кадр показываются один раз, в следующем кадре
+        self.result_trigger = Clock.create_trigger(self.apply_result)
+        # Одна анимация мигания на дисплей: пока она идет, новая не запускается
+        self.result_pulse = None
+        if self.pulse_opacity is not None:
+            self.result_pulse = (
+                Animation(opacity=self.pulse_opacity, duration=0.1) + Animation(opacity=1.0, duration=0.1)
+            )
+
+        self.bind(result_text=self.update_result)
+        self.bind(expression_text=self.update_expression)
+
+    def update_result(self, instance, value):
+        """Откладываем обновление результата до следующего кадра"""
+        self.result_trigger()
+
+    def apply_result(self, *args):
+        """Показываем последний result_text"""
+        if self.result_label.text == self.result_text:
+            return
+        pulse = self.result_pulse
+        if pulse is not None and not pulse.have_properties_to_animate(self.result_label):
+            pulse.start(self.result_label)
+        self.result_label.text = self.result_text
+
+    def update_expression(self, instance, value):
+        """Обновляем выражение"""
+        self.expression_label.text = value
@@ -0,0 +1,348 @@
+from lru import LRUCache
+from numeric import FLOAT
+import scientific
+import re
+
+# Узлы дерева - кортежи, первый элемент - тип узла:
+#   (NUM, значение)            число
+#   (VAR, имя)                 переменная
+#   (NEG, узел)                унарный минус
+#   (BIN, оп, левый, правый)   бинарная операция: '+', '-', '*', '/', '^'
+#   (CALL, имя, (аргументы))   вызов функции
+NUM, VAR, NEG, BIN, CALL = 'num', 'var', 'neg', 'bin', 'call'
+
+# Символы клавиатуры приводятся к обычным операторам
+OPERATOR_ALIASES = {'×': '*', '÷': '/', '−': '-', '**': '^'}
+BINARY_PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2, '^': 4}
+UNARY_PRECEDENCE = 3
+RIGHT_ASSOCIATIVE = {'^'}
+
+# Группы: число, имя, оператор, скобка; последняя ловит любой посторонний символ
+TOKEN_RE = re.compile(r"""
+    \s*(?:
+        ((?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+      | ([^\W\d]\w*)
+      | (\*\*|[-+*/^×÷−])
+      | ([(),])
+      | (\S)
+    )""", re.VERBOSE)
+
+# Предел размера целого результата степени в битах: дальше считаем во float.
+# 14000 бит - около 4200 цифр, столько Python еще согласен превратить в строку
+INT_POWER_BITS = 14000
+
+# Сколько скомпилированных выражений держит общий кэш
+CACHE_SIZE = 256
+
+FUNCTIONS = scientific.OPERATIONS
+
+
+class ExpressionError(ValueError):
+    """Ошибка разбора или вычисления выражения"""
+
+
+def tokenize(text):
+    """Разбиваем строку на токены (вид, значение)"""
+    tokens = []
+    append = tokens.append
+    for number, name, op, paren, unknown in TOKEN_RE.findall(text):
+        if number:
+            append(('number', number))
+        elif name:
+            append(('name', name))
+        elif op:
+            append(('op', OPERATOR_ALIASES.get(op, op)))
+        elif paren:
+            append(('paren', paren))
+        else:
+            raise ExpressionError(f"Неожиданный символ '{unknown}'")
+    return tokens
+
+
+class Parser:
+    """Разбор списка токенов с приоритетами операторов (precedence climbing)"""
+
+    def __init__(self, tokens, number=float):
+        self.tokens = tokens
+        self.number = number
+        self.position = 0
+
+    def peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def expect(self, value):
+        kind, found = self.take()
+        if found != value:
+            raise ExpressionError(f"Ожидалось '{value}'")
+
+    def parse(self):
+        if not self.tokens:
+            raise ExpressionError('Пустое выражение')
+        node = self.expression(0)
+        if self.position != len(self.tokens):
+            raise ExpressionError(f"Лишний токен '{self.peek()[1]}'")
+        return node
+
+    def expression(self, min_precedence):
+        node = self.unary()
+        while True:
+            kind, op = self.peek()
+            precedence = BINARY_PRECEDENCE.get(op) if kind == 'op' else None
+            if precedence is None or precedence < min_precedence:
+                return node
+            self.take()
+            next_precedence = precedence if op in RIGHT_ASSOCIATIVE else precedence + 1
+            node = fold((BIN, op, node, self.expression(next_precedence)))
+
+    def unary(self):
+        kind, op = self.peek()
+        if kind == 'op' and op in ('-', '+'):
+            self.take()
+            # Минус слабее степени: -2^2 = -(2^2)
+            operand = self.expression(UNARY_PRECEDENCE)
+            return fold((NEG, operand)) if op == '-' else operand
+        return self.primary()
+
+    def primary(self):
+        kind, value = self.take()
+        if kind == 'number':
+            return (NUM, self.number(value))
+        if kind == 'name':
+            if self.peek()[1] == '(':
+                self.take()
+                args = []
+                if self.peek()[1] != ')':
+                    args.append(self.expression(0))
+                    while self.peek()[1] == ',':
+                        self.take()
+                        args.append(self.expression(0))
+                self.expect(')')
+                return (CALL, value, tuple(args))
+            return (VAR, value)
+        if value == '(':
+            node = self.expression(0)
+            self.expect(')')
+            return node
+        if kind is None:
+            raise ExpressionError('Неожиданный конец выражения')
+        raise ExpressionError(f"Неожиданный токен '{value}'")
+
+
+def fold(node):
+    """Сворачиваем операции над константами еще при разборе"""
+    if node[0] == NEG and node[1][0] == NUM:
+        return (NUM, -node[1][1])
+    if node[0] == BIN and node[2][0] == NUM and node[3][0] == NUM:
+        try:
+            return (NUM, apply_operator(node[1], node[2][1], node[3][1]))
+        except (ArithmeticError, ExpressionError):
+            # Ошибку (например, деление на ноль) покажем при вычислении
+            return node
+    return node
+
+
+def parse(text, backend=FLOAT):
+    """Строим дерево выражения по строке; числа - в типе бэкенда"""
+    with backend.context():
+        return Parser(tokenize(text), backend.parse).parse()
+
+
+def apply_operator(op, left, right):
+    if op == '+':
+        return left + right
+    if op == '-':
+        return left - right
+    if op == '*':
+        return left * right
+    if op == '/':
+        if right == 0:
+            raise ExpressionError('Деление на ноль')
+        if type(left) is int and type(right) is int and not left % right:
+            # Целые делятся нацело: 6 / 3 = 2, а не 2.0
+            return left // right
+        return left / right
+    if type(left) is int and type(right) is int and right > 0 and abs(left) > 1:
+        if right * (abs(left).bit_length() - 1) > INT_POWER_BITS:
+            left = float(left)
+    try:
+        result = left ** right
+    except (OverflowError, ZeroDivisionError) as error:
+        raise ExpressionError(str(error)) from None
+    if isinstance(result, complex):
+        raise ExpressionError('Комплексный результат')
+    return result
+
+
+def evaluate(node, variables=None, functions=FUNCTIONS, backend=FLOAT):
+    """Вычисляем дерево; variables - значения переменных по имени"""
+    kind = node[0]
+    if kind == NUM:
+        return node[1]
+    if kind == BIN:
+        return apply_operator(
+            node[1],
+            evaluate(node[2], variables, functions, backend),
+            evaluate(node[3], variables, functions, backend)
+        )
+    if kind == NEG:
+        return -evaluate(node[1], variables, functions, backend)
+    if kind == VAR:
+        try:
+            return variables[node[1]]
+        except (KeyError, TypeError):
+            raise ExpressionError(f"Неизвестная переменная '{node[1]}'") from None
+    if kind == CALL:
+        function = functions.get(node[1])
+        if function is None:
+            raise ExpressionError(f"Неизвестная функция '{node[1]}'")
+        args = [evaluate(arg, variables, functions, backend) for arg in node[2]]
+        try:
+            return backend.coerce(function(*args))
+        except (TypeError, ValueError, ArithmeticError) as error:
+            raise ExpressionError(f"{node[1]}: {error}") from None
+    raise ExpressionError(f"Неизвестный узел '{kind}'")
+
+
+def variables_of(node):
+    """Имена переменных, которые встречаются в дереве"""
+    kind = node[0]
+    if kind == VAR:
+        return {node[1]}
+    if kind == NEG:
+        return variables_of(node[1])
+    if kind == BIN:
+        return variables_of(node[2]) | variables_of(node[3])
+    if kind == CALL:
+        return set().union(*(variables_of(arg) for arg in node[2]))
+    return set()
+
+
+def compile_tree(node, backend=FLOAT):
+    """Превращаем дерево в замыкание f(variables, functions)
+
+    Разбор по типам узлов делается один раз здесь, а при вычислении
+    вызываются только готовые функции. Результаты функций приводятся к
+    типу бэкенда, чтобы sin(30) + 1 не смешивал float и Decimal.
+    """
+    kind = node[0]
+    if kind == NUM:
+        value = node[1]
+        return lambda variables, functions: value
+    if kind == BIN:
+        op = node[1]
+        left = compile_tree(node[2], backend)
+        right = compile_tree(node[3], backend)
+        if op == '+':
+            return lambda variables, functions: left(variables, functions) + right(variables, functions)
+        if op == '-':
+            return lambda variables, functions: left(variables, functions) - right(variables, functions)
+        if op == '*':
+            return lambda variables, functions: left(variables, functions) * right(variables, functions)
+        return lambda variables, functions: apply_operator(
+            op, left(variables, functions), right(variables, functions)
+        )
+    if kind == NEG:
+        operand = compile_tree(node[1], backend)
+        return lambda variables, functions: -operand(variables, functions)
+    if kind == VAR:
+        name = node[1]
+
+        def variable(variables, functions):
+            try:
+                return variables[name]
+            except (KeyError, TypeError):
+                raise ExpressionError(f"Неизвестная переменная '{name}'") from None
+        return variable
+    if kind == CALL:
+        name = node[1]
+        args = [compile_tree(arg, backend) for arg in node[2]]
+        coerce = backend.coerce
+
+        def call(variables, functions):
+            function = functions.get(name)
+            if function is None:
+                raise ExpressionError(f"Неизвестная функция '{name}'")
+            values = [arg(variables, functions) for arg in args]
+            try:
+                return coerce(function(*values))
+            except (TypeError, ValueError, ArithmeticError) as error:
+                raise ExpressionError(f"{name}: {error}") from None
+        return call
+    raise ExpressionError(f"Неизвестный узел '{kind}'")
+
+
+class Expression:
+    """Разобранное выражение: строка разбирается один раз, вычисляется сколько угодно"""
+
+    __slots__ = ('text', 'backend', 'tree', 'variables', 'evaluator')
+
+    def __init__(self, text, backend=FLOAT):
+        self.text = text
+        self.backend = backend
+        self.tree = parse(text, backend)
+        self.variables = frozenset(variables_of(self.tree))
+        self.evaluator = compile_tree(self.tree, backend)
+
+    def evaluate(self, variables=None, functions=FUNCTIONS):
+        return self.backend.evaluate(self.evaluator, variables, functions)
+
+    def __repr__(self):
+        return f'Expression({self.text!r})'
+
+
+def normalize(text):
+    """Ключ кэша: одинаковые по смыслу записи выражения дают одну строку"""
+    # Ключ собирается из токенов, а не правкой текста: так '2 * * 3' остается
+    # двумя умножениями и ошибкой, а не превращается в '2^3'
+    return ' '.join([value for kind, value in tokenize(text)])
+
+
+class ExpressionCache:
+    """LRU-кэш скомпилированных выражений по нормализованному тексту и бэкенду"""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.compiled = LRUCache(maxsize)
+        # Нормализация запоминается для исходного текста: повтор той же строки
+        # стоит двух поисков в словаре
+        self.keys = {}
+
+    def get(self, text, backend=FLOAT):
+        """Скомпилированное выражение для текста; ошибки разбора не кэшируются"""
+        key = self.keys.get(text)
+        if key is None:
+            if len(self.keys) >= self.maxsize * 4:
+                self.keys.clear()
+            key = self.keys[text] = normalize(text)
+        key = (key, backend)
+        expression = self.compiled.get(key)
+        if expression is None:
+            expression = Expression(key[0], backend)
+            self.compiled.put(key, expression)
+        return expression
+
+    def clear(self):
+        self.compiled.clear()
+        self.keys.clear()
+
+    def stats(self):
+        return self.compiled.stats()
+
+
+_cache = ExpressionCache()
+
+
+def compile_expression(text, backend=FLOAT):
+    """Выражение из общего кэша процесса"""
+    return _cache.get(text, backend)
+
+
+def cache_stats():
+    return _cache.stats()
@@ -0,0 +1,196 @@
+from kivy import kivy_home_dir
+from kivy.core.text import Label as CoreLabel, LabelBase
+from kivy.graphics import Fbo, Color, Rectangle, ClearColor, ClearBuffers
+from kivy.graphics.texture import Texture
+from kivy.logger import Logger
+from kivy.resources import resource_find
+import hashlib
+import json
+import math
+import os
+
+# Размер ячейки атласа в пикселях: символы растрируются один раз и дальше только масштабируются
+GLYPH_CELL = 32
+CACHE_DIR = os.path.join(kivy_home_dir, 'calcuhill')
+# Шрифты с катаканой (в Roboto, шрифте Kivy по умолчанию, ее нет): ищутся в
+# fonts/ приложения, затем в системных каталогах Android, Linux, Windows и macOS
+KATAKANA_FONTS = (
+    'NotoSansJP-Regular.ttf', 'NotoSansCJK-Regular.ttc', 'NotoSansCJKjp-Regular.otf',
+    'NotoSansMonoCJKjp-Regular.otf', 'DroidSansFallbackFull.ttf', 'DroidSansFallback.ttf',
+    'TakaoGothic.ttf', 'ipag.ttf', 'YuGothR.ttc', 'msgothic.ttc', 'meiryo.ttc',
+    'ヒラギノ角ゴシック W3.ttc', 'Osaka.ttf',
+)
+
+_atlases = {}
+_system_fonts = None
+
+
+class MissingGlyphsError(ValueError):
+    """В шрифте нет глифов для части символов атласа"""
+
+    def __init__(self, chars, font_name):
+        super().__init__(f"Нет глифов для '{chars}' в шрифте {font_name or 'по умолчанию'}")
+        self.chars = chars
+        self.font_name = font_name
+
+
+def system_fonts():
+    """Файлы шрифтов из системных каталогов по имени файла; каталоги обходятся один раз"""
+    global _system_fonts
+    if _system_fonts is None:
+        _system_fonts = {}
+        for directory in LabelBase.get_system_fonts_dir():
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    _system_fonts.setdefault(name, os.path.join(root, name))
+    return _system_fonts
+
+
+def find_font(font_name):
+    """Путь к шрифту: font_name - имя, путь или список кандидатов; None - шрифт Kivy по умолчанию"""
+    names = [font_name] if isinstance(font_name, str) else list(font_name or ())
+    for name in names:
+        path = name if os.path.isfile(name) else resource_find(name)
+        if path:
+            return path
+    fonts = system_fonts() if names else {}
+    for name in names:
+        if name in fonts:
+            return fonts[name]
+    return None
+
+
+class GlyphAtlas:
+    """Атлас символов: все символы в одной текстуре и таблица UV-координат"""
+
+    def __init__(self, chars, cell=GLYPH_CELL, font_name=None, cache_dir=CACHE_DIR):
+        self.chars = ''.join(dict.fromkeys(chars))
+        self.cell = cell
+        self.font_name = font_name
+        self.cache_dir = cache_dir
+        self.cols = math.ceil(math.sqrt(len(self.chars)))
+        self.rows = math.ceil(len(self.chars) / self.cols)
+        self.size = (self.cols * cell, self.rows * cell)
+        self.uvs = {}
+        self.regions = {}
+        self.texture = None
+        self.from_cache = False
+        self.load()
+
+    @property
+    def cache_path(self):
+        key = hashlib.sha1(f"{self.chars}|{self.cell}|{self.font_name}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f'glyphs-{key[:16]}.atlas')
+
+    def load(self):
+        """Загружаем атлас с диска или растрируем символы заново и сохраняем для следующих запусков"""
+        pixels = self.read_cache()
+        self.from_cache = pixels is not None
+        if pixels is None:
+            pixels = self.rasterize()
+        # Атлас с заглушками вместо символов не показывается и не кэшируется
+        missing = self.missing_glyphs(pixels)
+        if missing:
+            raise MissingGlyphsError(missing, self.font_name)
+        if not self.from_cache:
+            self.write_cache(pixels)
+
+        self.texture = Texture.create(size=self.size, colorfmt='rgba')
+        self.texture.blit_buffer(pixels, colorfmt='rgba', bufferfmt='ubyte')
+
+        width, height = self.size
+        for n, char in enumerate(self.chars):
+            x, y = self.cell_origin(n)
+            self.uvs[char] = (x / width, y / height, (x + self.cell) / width, (y + self.cell) / height)
+            self.regions[char] = self.texture.get_region(x, y, self.cell, self.cell)
+
+    def cell_origin(self, n):
+        """Левый нижний угол ячейки n-го символа"""
+        return (n % self.cols) * self.cell, (n // self.cols) * self.cell
+
+    def missing_glyphs(self, pixels):
+        """Символы без своего глифа: пустая ячейка или ячейка, совпавшая с другой"""
+        # Шрифт рисует одинаковый квадрат-заглушку на месте любого символа, которого в нем нет
+        stride = self.size[0] * 4
+        width = self.cell * 4
+        cells = {}
+        missing = []
+        for n, char in enumerate(self.chars):
+            x, y = self.cell_origin(n)
+            start = y * stride + x * 4
+            cell = b''.join(
+                pixels[start + row * stride:start + row * stride + width] for row in range(self.cell)
+            )
+            if not any(cell[3::4]):
+                missing.append(char)
+            else:
+                cells.setdefault(cell, []).append(char)
+        for same in cells.values():
+            if len(same) > 1:
+                missing.extend(same)
+        return ''.join(char for char in self.chars if char in missing)
+
+    def rasterize(self):
+        """Рисуем все символы в Fbo и возвращаем белые глифы с альфой покрытия"""
+        fbo = Fbo(size=self.size)
+        with fbo:
+            ClearColor(0, 0, 0, 0)
+            ClearBuffers()
+            Color(1, 1, 1, 1)
+            for n, char in enumerate(self.chars):
+                options = {'text': char, 'font_size': self.cell * 0.8}
+                if self.font_name:
+                    options['font_name'] = self.font_name
+                label = CoreLabel(**options)
+                label.refresh()
+                x, y = self.cell_origin(n)
+                w, h = label.texture.size
+                Rectangle(
+                    texture=label.texture,
+                    pos=(x + (self.cell - w) / 2, y + (self.cell - h) / 2),
+                    size=(w, h)
+                )
+        fbo.draw()
+
+        # После смешивания на черном фоне красный канал равен покрытию символа
+        coverage = fbo.pixels[0::4]
+        pixels = bytearray(b'\xff' * (len(coverage) * 4))
+        pixels[3::4] = coverage
+        return bytes(pixels)
+
+    def read_cache(self):
+        """Читаем пиксели атласа из кэша, если он подходит по размеру"""
+        try:
+            with open(self.cache_path, 'rb') as f:
+                header = json.loads(f.readline())
+                pixels = f.read()
+        except (OSError, ValueError):
+            return None
+        if tuple(header.get('size', ())) != self.size or len(pixels) != self.size[0] * self.size[1] * 4:
+            return None
+        return pixels
+
+    def write_cache(self, pixels):
+        """Сохраняем пиксели атласа; ошибки записи не мешают работе"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self.cache_path, 'wb') as f:
+                f.write(json.dumps({'size': self.size, 'chars': self.chars}).encode('utf-8') + b'\n')
+                f.write(pixels)
+        except OSError:
+            pass
+
+
+def get_atlas(chars, cell=GLYPH_CELL, font_name=None, fallback_chars=None):
+    """Атлас для набора символов, общий для всех виджетов процесса"""
+    # Если в шрифте нет части chars, атлас строится из fallback_chars: смотрите atlas.chars
+    key = (chars, cell, font_name, fallback_chars)
+    if key not in _atlases:
+        try:
+            _atlases[key] = GlyphAtlas(chars, cell=cell, font_name=font_name)
+        except MissingGlyphsError as error:
+            if fallback_chars is None:
+                raise
+            Logger.warning(f'GlyphAtlas: {error}, используются символы {fallback_chars}')
+            _atlases[key] = GlyphAtlas(fallback_chars, cell=cell, font_name=font_name)
+    return _atlases[key]
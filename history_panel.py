@@ -0,0 +1,186 @@
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.label import Label
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recyclelayout import RecycleLayout
+from kivy.animation import Animation
+from kivy.properties import NumericProperty, StringProperty
+from kivy.metrics import dp
+from numeric import display_expression, display_text
+from profiler import profiled
+
+
+class HistoryItem(RecycleDataViewBehavior, BoxLayout):
+    """Строка истории: выражение и результат"""
+
+    expression = StringProperty('')
+    result = StringProperty('')
+
+    expression_color = (0.7, 0.7, 0.7, 1)
+    expression_font_size = 14
+    result_font_size = 16
+    appear_duration = 0
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.orientation = 'vertical'
+
+        # Строки переиспользуются RecycleView: метки создаются один раз, при прокрутке меняется текст
+        self.expr_label = Label(
+            color=self.expression_color,
+            font_size=dp(self.expression_font_size),
+            halign='left'
+        )
+        self.result_label = Label(
+            color=(0, 1, 1, 1),
+            font_size=dp(self.result_font_size),
+            halign='right',
+            bold=True
+        )
+        self.add_widget(self.expr_label)
+        self.add_widget(self.result_label)
+
+    def on_expression(self, instance, value):
+        self.expr_label.text = display_expression(value)
+
+    def on_result(self, instance, value):
+        # В данных строки и в журнале остается полное значение
+        self.result_label.text = f'= {display_text(value)}'
+
+    def refresh_view_attrs(self, rv, index, data):
+        """Заполняем строку данными; новую запись показываем с анимацией"""
+        Animation.cancel_all(self, 'opacity')
+        self.opacity = 1
+        if self.appear_duration and data.get('new'):
+            data['new'] = False
+            self.opacity = 0
+            Animation(opacity=1, duration=self.appear_duration).start(self)
+        return super().refresh_view_attrs(rv, index, data)
+
+
+class HistoryLayout(RecycleLayout):
+    """Вертикальная раскладка строк одинаковой высоты для RecycleView"""
+
+    row_height = NumericProperty(dp(60))
+    spacing = NumericProperty(0)
+    padding = NumericProperty(0)
+    minimum_height = NumericProperty(0)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.fbind('row_height', self._catch_layout_trigger)
+        self.fbind('spacing', self._catch_layout_trigger)
+        self.fbind('padding', self._catch_layout_trigger)
+
+    def row_opts(self):
+        return {
+            'size': [None, self.row_height], 'size_hint': [1, None],
+            'size_hint_min': [None, None], 'size_hint_max': [None, None],
+            'pos': None, 'pos_hint': {}, 'viewclass': self.viewclass,
+            'width_none': False, 'height_none': False,
+        }
+
+    def compute_sizes_from_data(self, data, flags):
+        opts = self.view_opts
+        appended = [flag['appended'] for flag in flags if flag and set(flag) == {'appended'}]
+        if flags and len(appended) == len(flags):
+            for added in appended:
+                opts.extend(self.row_opts() for _ in range(added.stop - added.start))
+        else:
+            self.clear_layout()
+            self.view_opts = [self.row_opts() for _ in data]
+
+    def compute_layout(self, data, flags):
+        super().compute_layout(data, flags)
+        count = len(data)
+        self.minimum_height = (
+            self.padding * 2 + count * self.row_height + max(0, count - 1) * self.spacing
+        )
+        if [f for f in flags if not f] or self._changed_views:
+            self.clear_layout()
+
+    def row_range(self, bottom, top, count):
+        """Индексы строк, пересекающих полосу по высоте [bottom, top]"""
+        step = self.row_height + self.spacing
+        start = self.top - self.padding
+        first = max(0, int((start - top) // step))
+        last = min(count - 1, int((start - bottom) // step))
+        return first, last
+
+    def get_view_index_at(self, pos):
+        count = len(self.view_opts)
+        if not count:
+            return 0
+        return self.row_range(pos[1], pos[1], count)[0]
+
+    def compute_visible_views(self, data, viewport):
+        # Позиции считаются арифметически и только для видимых строк, а не хранятся
+        # списком, как в RecycleBoxLayout: прокрутка не зависит от длины истории
+        count = len(data)
+        if not count:
+            return []
+        x, y, w, h = viewport
+        first, last = self.row_range(y, y + h, count)
+        step = self.row_height + self.spacing
+        top = self.top - self.padding
+        width = self.width - self.padding * 2
+        opts = self.view_opts
+        for index in range(first, last + 1):
+            opt = opts[index]
+            opt['pos'] = [self.x + self.padding, top - index * step - self.row_height]
+            opt['size'] = [width, self.row_height]
+        return list(range(first, last + 1))
+
+
+class HistoryPanel(BoxLayout):
+    """Панель истории вычислений"""
+
+    # Варианты приложения настраивают оформление через атрибуты класса
+    title_text = 'История'
+    background_color = (0.1, 0.1, 0.15, 0.9)
+    title_font_size = 20
+    title_height = 40
+    item_class = HistoryItem
+    item_height = 60
+    item_spacing = 5
+    list_padding = 0
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.orientation = 'vertical'
+        self.size_hint_x = 0.8
+        self.pos_hint = {'right': 1}
+
+        # Заголовок
+        title = Label(
+            text=self.title_text,
+            color=(0, 1, 1, 1),
+            font_size=dp(self.title_font_size),
+            size_hint_y=None,
+            height=dp(self.title_height)
+        )
+        self.add_widget(title)
+
+        # Список истории: записи - словари в data, виджеты только для видимых строк
+        self.history_view = RecycleView(size_hint=(1, 1))
+        history_layout = HistoryLayout(
+            viewclass=self.item_class,
+            row_height=dp(self.item_height),
+            spacing=dp(self.item_spacing),
+            padding=dp(self.list_padding),
+            size_hint_y=None
+        )
+        history_layout.bind(minimum_height=history_layout.setter('height'))
+        self.history_view.add_widget(history_layout)
+        self.add_widget(self.history_view)
+
+    @profiled('add_history_item')
+    def add_history_item(self, expression, result):
+        """Добавляем элемент в историю"""
+        self.history_view.data.append({'expression': expression, 'result': result, 'new': True})
+
+    def load_history(self, records):
+        """Показываем сохраненные записи одним обновлением списка, без анимации"""
+        self.history_view.data = [
+            {'expression': record['expression'], 'result': record['result']} for record in records
+        ]
@@ -0,0 +1,153 @@
+from kivy import kivy_home_dir
+from kivy.app import App
+from datetime import datetime
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+
+# Сколько последних записей поднимается в панель истории при запуске
+HISTORY_LIMIT = 200
+HISTORY_FILE = 'history.jsonl'
+# Блок, которым файл читается с конца при загрузке последних записей
+READ_BLOCK = 64 * 1024
+
+
+def default_path():
+    """Файл истории в каталоге данных приложения"""
+    app = App.get_running_app()
+    directory = app.user_data_dir if app else os.path.join(kivy_home_dir, 'calcuhill')
+    return os.path.join(directory, HISTORY_FILE)
+
+
+class HistoryStore:
+    """Журнал вычислений: одна JSON-строка на запись, только дописывание"""
+
+    def __init__(self, path=None, flush_interval=1.0):
+        self.path = path or default_path()
+        self.flush_interval = flush_interval
+        # Интерфейс только кладет строки в очередь, а поток пишет их пачкой
+        # и вызывает fsync не чаще раза в flush_interval секунд
+        self.queue = queue.Queue()
+        self.closed = False
+        self.writer = threading.Thread(target=self.write_loop, name='history-store', daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    def append(self, expression, result):
+        """Добавляем запись; возвращается сразу, запись на диск отложена"""
+        record = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'expression': expression,
+            'result': result,
+        }
+        if not self.closed:
+            self.queue.put(json.dumps(record, ensure_ascii=False) + '\n')
+        return record
+
+    def flush(self):
+        """Просим поток сразу записать очередь на диск и ждем этого"""
+        if self.closed:
+            return
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait()
+
+    def close(self):
+        """Дописываем очередь и останавливаем поток"""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.writer.join()
+
+    def write_loop(self):
+        lines = []
+        events = []
+        last_sync = time.monotonic()
+        running = True
+        while running:
+            timeout = max(0.0, last_sync + self.flush_interval - time.monotonic()) if lines else None
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False
+            # Забираем все, что успело накопиться, одной пачкой
+            while item is not False:
+                if item is None:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    events.append(item)
+                else:
+                    lines.append(item)
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    item = False
+
+            due = time.monotonic() - last_sync >= self.flush_interval
+            if lines and (due or events or not running):
+                self.write(lines)
+                lines = []
+                last_sync = time.monotonic()
+            for event in events:
+                event.set()
+            events = []
+
+    def write(self, lines):
+        """Дописываем строки в файл; ошибки записи не мешают работе"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            if not self.ends_with_newline():
+                # Не приклеиваем запись к строке, оборванной при аварийном завершении
+                lines = ['\n'] + lines
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.writelines(lines)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError:
+            pass
+
+    def ends_with_newline(self):
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                if not f.tell():
+                    return True
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) == b'\n'
+        except OSError:
+            return True
+
+    def load_recent(self, limit=HISTORY_LIMIT):
+        """Последние limit записей, от старых к новым"""
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                position = f.tell()
+                tail = b''
+                # Читаем блоки с конца, пока не наберется limit полных строк
+                while position and tail.count(b'\n') <= limit:
+                    step = min(READ_BLOCK, position)
+                    position -= step
+                    f.seek(position)
+                    tail = f.read(step) + tail
+        except OSError:
+            return []
+
+        lines = tail.splitlines()
+        if position:
+            # Первая строка блока могла начаться раньше него
+            lines = lines[1:]
+        records = []
+        for line in lines[-limit:] if limit else []:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Оборванная строка после аварийного завершения
+                continue
+            if isinstance(record, dict) and 'expression' in record and 'result' in record:
+                records.append(record)
+        return records
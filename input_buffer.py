@@ -0,0 +1,137 @@
+class InputBuffer:
+    """Набираемое число как структура: цифры, знак, позиция точки, порядок"""
+
+    # Добавление, стирание и смена знака стоят O(1) при любой длине числа; текст
+    # собирается, только когда его просит дисплей, и кэшируется в _text
+    __slots__ = ('digits', 'negative', 'point', 'exponent', 'exponent_negative', 'raw', '_text')
+
+    def __init__(self, text='0'):
+        self.clear()
+        self.load(text)
+
+    def clear(self):
+        """Пустой ввод, который показывается как 0"""
+        self.digits = []
+        self.negative = False
+        self.point = None
+        self.exponent = None
+        self.exponent_negative = False
+        self.raw = None
+        self._text = None
+
+    def load(self, text):
+        """Заполняем буфер готовым числом, например результатом вычисления"""
+        # digits и point не сбрасываются: пока задан raw, они не используются
+        self.exponent = None
+        self._text = text
+        self.negative = text.startswith('-')
+        if self.negative:
+            text = text[1:]
+        # Новая цифра все равно начнет число заново, поэтому разбирать текст сразу незачем
+        self.raw = text
+
+    def expand(self):
+        """Раскладываем готовое число из raw на цифры, если оно десятичное"""
+        whole, point, fraction = self.raw.partition('.')
+        if (whole + fraction).isdecimal():
+            self.digits = list(whole + fraction)
+            self.point = len(whole) if point else None
+            self.raw = None
+
+    def append(self, char):
+        """Добавляем цифру или точку"""
+        if self.raw is not None:
+            self.clear()
+        if self.exponent is not None:
+            if char != '.':
+                self.exponent.append(char)
+                self._text = None
+            return
+        if char == '.':
+            if self.point is not None:
+                return
+            if not self.digits:
+                self.digits.append('0')
+            self.point = len(self.digits)
+        elif self.digits == ['0'] and self.point is None:
+            # Ведущий ноль заменяется: 0 -> 5, а не 05
+            self.digits[0] = char
+        else:
+            self.digits.append(char)
+        self._text = None
+
+    def start_exponent(self):
+        """Переходим к вводу порядка (1.5e...)"""
+        if self.raw is None and self.exponent is None:
+            if not self.digits:
+                self.digits.append('1')
+            self.exponent = []
+            self.exponent_negative = False
+            self._text = None
+
+    def backspace(self):
+        """Удаляем последний введенный символ"""
+        if self.raw is not None:
+            self.expand()
+        if self.raw is not None:
+            # 1e+30, 3/10, inf по символу не стираются
+            self.clear()
+        elif self.exponent is not None:
+            if self.exponent:
+                self.exponent.pop()
+            else:
+                self.exponent = None
+                self.exponent_negative = False
+        elif self.point is not None and self.point == len(self.digits):
+            self.point = None
+        elif self.digits:
+            self.digits.pop()
+        if not self.digits and self.point is None:
+            self.negative = False
+        self._text = None
+
+    def negate(self):
+        """Меняем знак числа (в режиме порядка - знак порядка)"""
+        if self.exponent is not None:
+            self.exponent_negative = not self.exponent_negative
+        else:
+            self.negative = not self.negative
+        self._text = None
+
+    def is_zero_literal(self):
+        """Ввод выглядит как «0» - такой ноль знак не меняет"""
+        if self.raw is not None:
+            return self.raw == '0'
+        return self.digits in ([], ['0']) and self.point is None and self.exponent is None
+
+    def number_text(self):
+        """Текст для разбора числа: недописанный порядок (1.5e, 1e-) отбрасывается целиком"""
+        if self.exponent == []:
+            return self.render(exponent=False)
+        text = self._text
+        if text is None:
+            text = self._text = self.render()
+        return text
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = self.render()
+        return self._text
+
+    def render(self, exponent=True):
+        sign = '-' if self.negative else ''
+        if self.raw is not None:
+            return sign + self.raw
+        digits = ''.join(self.digits) or '0'
+        if self.point is not None:
+            digits = f'{digits[:self.point]}.{digits[self.point:]}'
+        if exponent and self.exponent is not None:
+            digits += 'e' + ('-' if self.exponent_negative else '') + ''.join(self.exponent)
+        return sign + digits
+
+    def __len__(self):
+        return len(self.digits) + (len(self.exponent) if self.exponent else 0)
+
+    def __repr__(self):
+        return f'InputBuffer({self.text!r})'
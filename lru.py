@@ -0,0 +1,44 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Словарь ограниченного размера: при переполнении уходит самая давно прочитанная запись"""
+
+    __slots__ = ('maxsize', 'entries', 'hits', 'misses', 'evictions')
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        # Счетчики показывают, насколько кэш помогает
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Значение по ключу или None; попадание делает запись самой свежей"""
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        entries = self.entries
+        entries[key] = value
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        return {
+            'size': len(self.entries), 'maxsize': self.maxsize,
+            'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+        }
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,484 @@
+from kivy.uix.widget import Widget
+from kivy.core.window import Window
+from kivy.clock import Clock
+from kivy.graphics import Color, Rectangle, Mesh, RenderContext
+from glyph_atlas import get_atlas, find_font, KATAKANA_FONTS
+from profiler import profiled
+from array import array
+from importlib.util import find_spec
+import os
+import random
+import time
+
+# numpy (около 45 мс импорта) загружается при создании первого векторного
+# дождя, а не при импорте модуля; без numpy столбцы капель хранятся в array
+# и обновляются циклом
+HAVE_NUMPY = find_spec('numpy') is not None
+numpy = None
+
+
+def load_numpy():
+    """Импортируем numpy при первом использовании"""
+    global numpy
+    if numpy is None:
+        import numpy as module
+        numpy = module
+    return numpy
+
+# Шейдеры меша: цвет берется из вершины, а не из инструкции Color
+MESH_VERTEX_SHADER = '''
+$HEADER$
+attribute vec4 vColor;
+
+void main(void) {
+    frag_color = vColor * vec4(1.0, 1.0, 1.0, opacity);
+    tex_coord0 = vTexCoords0;
+    gl_Position = projection_mat * modelview_mat * vec4(vPosition.xy, 0.0, 1.0);
+}
+'''
+
+MESH_FRAGMENT_SHADER = '''
+$HEADER$
+
+void main(void) {
+    gl_FragColor = frag_color * texture2D(texture0, tex_coord0);
+}
+'''
+
+MESH_FORMAT = [
+    (b'vPosition', 2, 'float'),
+    (b'vTexCoords0', 2, 'float'),
+    (b'vColor', 4, 'float'),
+]
+VERTEX_SIZE = 8
+# Индексы меша 16-битные, поэтому в один Mesh помещается не больше 16383 символов
+MESH_GLYPH_LIMIT = 65535 // 4
+
+# Уровни качества фона: название, доля капель и частота обновления
+QUALITY_TIERS = (
+    ('high', 1.0, 60),
+    ('medium', 0.6, 30),
+    ('low', 0.3, 15),
+)
+
+
+class InstructionRenderer:
+    """Отдельная пара Color + Rectangle на каждый символ"""
+
+    def __init__(self, rain):
+        self.rain = rain
+        self.colors = []
+        self.rects = []
+
+    def build(self):
+        """Создаем инструкции для всех капель"""
+        rain = self.rain
+        size = (rain.char_size, rain.char_size)
+        xs = rain.drop_x.tolist()
+        ys = rain.drop_y.tolist()
+        self.colors = []
+        self.rects = []
+        with rain.canvas:
+            for index, chars in enumerate(rain.glyphs):
+                colors = []
+                rects = []
+                for i, char in enumerate(chars):
+                    colors.append(Color(0, 1, 0, rain.glyph_alpha(index, i)))
+                    rects.append(Rectangle(
+                        pos=(xs[index], ys[index] - i * rain.char_step),
+                        size=size,
+                        texture=rain.get_char_texture(char)
+                    ))
+                self.colors.append(colors)
+                self.rects.append(rects)
+
+    def recolor(self, indices):
+        """Обновляем прозрачность символов перезапущенных капель"""
+        for index in indices:
+            for i, color in enumerate(self.colors[index]):
+                color.a = self.rain.glyph_alpha(index, i)
+
+    def move(self):
+        """Переносим существующие инструкции на новые позиции"""
+        step = self.rain.char_step
+        for x, y, rects in zip(self.rain.drop_x.tolist(), self.rain.drop_y.tolist(), self.rects):
+            for i, rect in enumerate(rects):
+                rect.pos = (x, y - i * step)
+
+    def draw_calls(self):
+        return sum(len(rects) for rects in self.rects)
+
+
+class MeshRenderer:
+    """Все символы всех капель в одном Mesh с цветом в вершинах и UV из атласа"""
+
+    def __init__(self, rain):
+        self.rain = rain
+        self.context = None
+        self.meshes = []
+        self.vertices = None
+        self.offsets = []
+
+    def build(self):
+        """Собираем вершины и индексы для всех символов"""
+        rain = self.rain
+        uvs = rain.atlas.uvs
+        lengths = rain.drop_length.tolist()
+        self.offsets = []
+        glyph_drop = []
+        glyph_fade = []
+        template = []
+        for index, chars in enumerate(rain.glyphs):
+            self.offsets.append(len(template))
+            for i, char in enumerate(chars):
+                glyph_drop.append(index)
+                glyph_fade.append(1.0 - i / lengths[index])
+                u0, v0, u1, v1 = uvs[char]
+                for u, v in ((u0, v0), (u1, v0), (u1, v1), (u0, v1)):
+                    template.extend((0.0, 0.0, u, v, 0.0, 1.0, 0.0, 0.0))
+
+        if rain.vectorized:
+            self.vertices = numpy.array(template, dtype=numpy.float32)
+            self.glyph_drop = numpy.array(glyph_drop, dtype=numpy.int32)
+            self.glyph_fade = numpy.array(glyph_fade, dtype=numpy.float32)
+            self.glyph_dy = numpy.array(
+                [i * rain.char_step for length in lengths for i in range(length)],
+                dtype=numpy.float32
+            )
+        else:
+            self.vertices = array('f', template)
+        self.recolor(range(len(lengths)))
+        self.place_all()
+
+        context = RenderContext(use_parent_projection=True, use_parent_modelview=True)
+        context.shader.vs = MESH_VERTEX_SHADER
+        context.shader.fs = MESH_FRAGMENT_SHADER
+        self.meshes = []
+        for chunk in self.chunks():
+            count = len(chunk) // (4 * VERTEX_SIZE)
+            indices = []
+            for g in range(count):
+                base = g * 4
+                indices.extend((base, base + 1, base + 2, base + 2, base + 3, base))
+            mesh = Mesh(
+                vertices=chunk,
+                indices=indices,
+                fmt=MESH_FORMAT,
+                mode='triangles',
+                texture=rain.atlas.texture
+            )
+            context.add(mesh)
+            self.meshes.append(mesh)
+        rain.canvas.add(context)
+        self.context = context
+
+    def chunks(self):
+        """Делим буфер вершин на части, помещающиеся в 16-битные индексы"""
+        size = MESH_GLYPH_LIMIT * 4 * VERTEX_SIZE
+        return [self.vertices[start:start + size] for start in range(0, len(self.vertices), size)]
+
+    def place_all(self):
+        """Пересчитываем координаты вершин всех символов"""
+        rain = self.rain
+        size = rain.char_size
+        if rain.vectorized:
+            quads = self.vertices.reshape(-1, 4, VERTEX_SIZE)
+            x0 = rain.drop_x[self.glyph_drop]
+            y0 = rain.drop_y[self.glyph_drop] - self.glyph_dy
+            x1 = x0 + size
+            y1 = y0 + size
+            quads[:, 0, 0] = x0
+            quads[:, 0, 1] = y0
+            quads[:, 1, 0] = x1
+            quads[:, 1, 1] = y0
+            quads[:, 2, 0] = x1
+            quads[:, 2, 1] = y1
+            quads[:, 3, 0] = x0
+            quads[:, 3, 1] = y1
+            return
+
+        vertices = self.vertices
+        step = rain.char_step
+        for x0, y, length, offset in zip(rain.drop_x, rain.drop_y, rain.drop_length, self.offsets):
+            x1 = x0 + size
+            for i in range(length):
+                y0 = y - i * step
+                y1 = y0 + size
+                vertices[offset] = x0
+                vertices[offset + 1] = y0
+                vertices[offset + 8] = x1
+                vertices[offset + 9] = y0
+                vertices[offset + 16] = x1
+                vertices[offset + 17] = y1
+                vertices[offset + 24] = x0
+                vertices[offset + 25] = y1
+                offset += 4 * VERTEX_SIZE
+
+    def recolor(self, indices):
+        """Обновляем прозрачность вершин перезапущенных капель"""
+        rain = self.rain
+        if rain.vectorized:
+            alpha = self.glyph_fade * rain.drop_brightness[self.glyph_drop] * rain.alpha_scale
+            self.vertices.reshape(-1, 4, VERTEX_SIZE)[:, :, 7] = alpha[:, None]
+            return
+
+        for index in indices:
+            offset = self.offsets[index] + 7
+            for i in range(rain.drop_length[index]):
+                alpha = rain.glyph_alpha(index, i)
+                for corner in range(4):
+                    self.vertices[offset + corner * VERTEX_SIZE] = alpha
+                offset += 4 * VERTEX_SIZE
+
+    def move(self):
+        """Пересчитываем вершины и отдаем их мешам"""
+        self.place_all()
+        for mesh, chunk in zip(self.meshes, self.chunks()):
+            mesh.vertices = chunk
+
+    def draw_calls(self):
+        return len(self.meshes)
+
+
+RENDERERS = {
+    'instructions': InstructionRenderer,
+    'mesh': MeshRenderer,
+}
+
+
+class MatrixRain(Widget):
+    """Матричный дождь на заднем плане"""
+
+    # Варианты приложения настраивают дождь через атрибуты класса
+    chars = "01アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワヲン"
+    drop_count = 30
+    speed_range = (0.5, 2.0)
+    length_range = (3, 12)
+    brightness_range = (0.1, 0.8)
+    alpha_scale = 0.4
+    char_step = 18
+    char_size = 16
+    # Шрифт атласа: имя в fonts/, путь или список кандидатов; CALCUHILL_RAIN_FONT важнее
+    font_name = KATAKANA_FONTS
+    # Символы дождя, если ни одного шрифта с катаканой не нашлось
+    fallback_chars = "0123456789ABCDEFXZ+-*=<>:"
+    # Скорость капель задана в пикселях за кадр при этой частоте, а движение
+    # считается по dt и не зависит от реальной частоты кадров
+    reference_fps = 60
+
+    def __init__(self, **kwargs):
+        self.drop_count = kwargs.pop('drop_count', self.drop_count)
+        self.base_drop_count = self.drop_count
+        # С numpy падение, перенос наверх и перезапуск капель - одна векторная операция
+        self.vectorized = kwargs.pop('vectorized', HAVE_NUMPY)
+        if self.vectorized:
+            if not HAVE_NUMPY:
+                raise ValueError("Векторное обновление дождя требует numpy")
+            load_numpy()
+        # Способ отрисовки: 'instructions' или 'mesh', по умолчанию из CALCUHILL_RAIN
+        backend = kwargs.pop('backend', None) or os.environ.get('CALCUHILL_RAIN', 'instructions')
+        if backend not in RENDERERS:
+            raise ValueError(f"Неизвестный способ отрисовки дождя: {backend}")
+        super().__init__(**kwargs)
+        self.backend = backend
+        font_name = find_font(os.environ.get('CALCUHILL_RAIN_FONT') or self.font_name)
+        self.atlas = get_atlas(self.chars, font_name=font_name, fallback_chars=self.fallback_chars)
+        self.chars = self.atlas.chars
+        self.create_drops()
+
+    def create_drops(self):
+        """Создаем капли матричного дождя и их инструкции отрисовки"""
+        self.canvas.clear()
+        count = self.drop_count
+        width = int(Window.width)
+        height = int(Window.height)
+        lengths = [random.randint(*self.length_range) for _ in range(count)]
+        self.glyphs = [[random.choice(self.chars) for _ in range(length)] for length in lengths]
+        # Состояние капель хранится столбцами: массивами numpy, если он есть, иначе array
+        self.drop_x = self.column([random.randint(0, width) for _ in range(count)])
+        self.drop_y = self.column([random.randint(0, height) for _ in range(count)])
+        self.drop_speed = self.column([random.uniform(*self.speed_range) for _ in range(count)])
+        self.drop_brightness = self.column([random.uniform(*self.brightness_range) for _ in range(count)])
+        self.drop_length = self.column(lengths, integer=True)
+        if self.vectorized:
+            self.rng = numpy.random.default_rng(random.getrandbits(32))
+        # Инструкции создаются один раз, на кадре меняются только координаты и прозрачность
+        self.renderer = RENDERERS[self.backend](self)
+        self.renderer.build()
+
+    def column(self, values, integer=False):
+        """Непрерывный столбец состояния капель"""
+        if self.vectorized:
+            return numpy.array(values, dtype=numpy.int32 if integer else numpy.float32)
+        return array('i' if integer else 'f', values)
+
+    def glyph_alpha(self, index, i):
+        """Прозрачность i-го символа капли"""
+        return (1.0 - (i / self.drop_length[index])) * self.drop_brightness[index] * self.alpha_scale
+
+    def set_density(self, fraction):
+        """Меняем число капель как долю от исходного и пересобираем дождь"""
+        count = max(1, round(self.base_drop_count * fraction))
+        if count != self.drop_count:
+            self.drop_count = count
+            self.create_drops()
+
+    @profiled('matrix_rain.update')
+    def update(self, dt):
+        """Обновляем позиции капель"""
+        frames = dt * self.reference_fps
+        if self.vectorized:
+            wrapped = self.fall_vectorized(frames)
+        else:
+            wrapped = self.fall(frames)
+        if len(wrapped):
+            self.renderer.recolor(wrapped)
+        self.draw()
+
+    def fall(self, frames):
+        """Сдвигаем капли циклом и возвращаем индексы перезапущенных"""
+        x, y, speed, brightness = self.drop_x, self.drop_y, self.drop_speed, self.drop_brightness
+        top = Window.height + 100
+        width = int(Window.width)
+        wrapped = []
+        for index in range(len(y)):
+            y[index] -= speed[index] * frames
+            if y[index] < -100:
+                y[index] = top
+                x[index] = random.randint(0, width)
+                brightness[index] = random.uniform(*self.brightness_range)
+                wrapped.append(index)
+        return wrapped
+
+    def fall_vectorized(self, frames):
+        """Сдвигаем все капли одной операцией numpy и перезапускаем упавшие"""
+        self.drop_y -= self.drop_speed * numpy.float32(frames)
+        wrapped = numpy.flatnonzero(self.drop_y < -100)
+        if wrapped.size:
+            self.drop_y[wrapped] = Window.height + 100
+            self.drop_x[wrapped] = self.rng.integers(0, int(Window.width), wrapped.size, endpoint=True)
+            self.drop_brightness[wrapped] = self.rng.uniform(*self.brightness_range, wrapped.size)
+        return wrapped
+
+    def draw(self):
+        """Переносим существующие инструкции на новые позиции"""
+        self.renderer.move()
+
+    def draw_calls(self):
+        """Сколько вызовов отрисовки тратит дождь на кадр"""
+        return self.renderer.draw_calls()
+
+    def get_char_texture(self, char):
+        """Получаем текстуру символа из атласа"""
+        return self.atlas.regions[char]
+
+
+class RainScheduler:
+    """Планировщик анимации дождя с адаптивным качеством"""
+
+    # Кадр дольше overrun_factor бюджетов - перерасход; после overrun_limit перерасходов
+    # подряд уровень QUALITY_TIERS понижается, после recover_seconds без них - повышается
+    overrun_factor = 1.5
+    overrun_limit = 30
+    recover_seconds = 10.0
+    max_dt = 0.25
+    smoothing = 0.1
+
+    def __init__(self, rain, fps=60, tiers=QUALITY_TIERS):
+        self.rain = rain
+        self.tiers = [(name, fraction, min(rate, fps)) for name, fraction, rate in tiers]
+        self.tier_index = 0
+        self.event = None
+        self.running = False
+        self.paused = False
+        self.frame_time = 0.0
+        self.update_time = 0.0
+        self.overruns = 0
+        self.total_overruns = 0
+        self.calm_time = 0.0
+
+    @property
+    def tier(self):
+        """Название текущего уровня качества"""
+        return self.tiers[self.tier_index][0]
+
+    @property
+    def fps(self):
+        return self.tiers[self.tier_index][2]
+
+    @property
+    def quality(self):
+        """Состояние планировщика для телеметрии"""
+        return {
+            'tier': self.tier,
+            'drops': self.rain.drop_count,
+            'fps': self.fps,
+            'frame_ms': self.frame_time * 1000.0,
+            'update_ms': self.update_time * 1000.0,
+            'overruns': self.total_overruns,
+            'paused': self.paused,
+        }
+
+    def start(self):
+        """Запускаем анимацию и следим за сворачиванием окна"""
+        self.running = True
+        Window.bind(on_minimize=self.pause, on_restore=self.resume)
+        self.schedule()
+
+    def stop(self):
+        """Останавливаем анимацию совсем"""
+        self.running = False
+        Window.unbind(on_minimize=self.pause, on_restore=self.resume)
+        self.unschedule()
+
+    def pause(self, *args):
+        """Приостанавливаем обновления (on_pause, сворачивание окна)"""
+        self.paused = True
+        self.unschedule()
+
+    def resume(self, *args):
+        """Возобновляем обновления после паузы"""
+        self.paused = False
+        self.schedule()
+
+    def schedule(self):
+        self.unschedule()
+        if self.running and not self.paused:
+            self.event = Clock.schedule_interval(self.tick, 1.0 / self.fps)
+
+    def unschedule(self):
+        if self.event is not None:
+            self.event.cancel()
+            self.event = None
+
+    def tick(self, dt):
+        """Один кадр анимации с замером времени"""
+        start = time.perf_counter()
+        self.rain.update(min(dt, self.max_dt))
+        cost = time.perf_counter() - start
+
+        self.frame_time += (dt - self.frame_time) * self.smoothing
+        self.update_time += (cost - self.update_time) * self.smoothing
+
+        if dt > self.overrun_factor / self.fps:
+            self.overruns += 1
+            self.total_overruns += 1
+            self.calm_time = 0.0
+            if self.overruns >= self.overrun_limit:
+                self.set_tier(self.tier_index + 1)
+        else:
+            self.overruns = 0
+            self.calm_time += dt
+            if self.calm_time >= self.recover_seconds:
+                self.set_tier(self.tier_index - 1)
+
+    def set_tier(self, index):
+        """Переключаем уровень качества"""
+        index = max(0, min(index, len(self.tiers) - 1))
+        self.overruns = 0
+        self.calm_time = 0.0
+        if index == self.tier_index:
+            return
+        self.tier_index = index
+        self.rain.set_density(self.tiers[index][1])
+        self.schedule()
@@ -0,0 +1,164 @@
+from contextlib import nullcontext
+from fractions import Fraction
+import decimal
+import os
+
+# Точность Decimal по умолчанию, как у стандартного контекста decimal
+DECIMAL_PRECISION = 28
+
+# Сколько символов числа показывают метки дисплея и истории: точное целое
+# степени занимает тысячи цифр, а такая метка не помещается в текстуру GL.
+# Длиннее - показываем DISPLAY_DIGITS значащих цифр с экспонентой
+DISPLAY_LENGTH = 24
+DISPLAY_DIGITS = 16
+DISPLAY_CONTEXT = decimal.Context(prec=DISPLAY_DIGITS, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+
+
+class NumericBackend:
+    """Общая часть числовых режимов: parse, coerce, format и контекст вычислений"""
+
+    name = None
+    type = None
+
+    def parse(self, text):
+        return self.type(text)
+
+    def coerce(self, value):
+        """Приводим результат функции (например, math.sin) к типу режима"""
+        if type(value) is self.type:
+            return value
+        return self.parse(repr(value))
+
+    def format(self, value):
+        return str(value)
+
+    def literal(self, value):
+        """Число в виде, пригодном для вставки в выражение"""
+        return self.format(value)
+
+    def context(self):
+        return nullcontext()
+
+    def evaluate(self, function, *args):
+        return function(*args)
+
+    def __repr__(self):
+        return f'{type(self).__name__}()'
+
+
+class FloatBackend(NumericBackend):
+    """Числа с плавающей точкой: самый быстрый и неточный режим"""
+
+    name = 'float'
+    type = float
+
+    def __init__(self, integers=True):
+        # Числа без точки остаются int (2 + 3 дает 5, а не 5.0) и переходят во float
+        # только там, где без этого не обойтись: деление, корни, синусы
+        self.integers = integers
+
+    def parse(self, text):
+        if self.integers and '.' not in text:
+            try:
+                return int(text)
+            except ValueError:
+                # 1e5, inf и nan остаются float
+                pass
+        return float(text)
+
+    def coerce(self, value):
+        if type(value) is float or (type(value) is int and self.integers):
+            return value
+        return float(value)
+
+    def __repr__(self):
+        return f'FloatBackend(integers={self.integers})'
+
+
+class DecimalBackend(NumericBackend):
+    """Десятичные числа decimal.Decimal: 0.1 + 0.2 дает ровно 0.3"""
+
+    name = 'decimal'
+    type = decimal.Decimal
+
+    def __init__(self, precision=DECIMAL_PRECISION):
+        # Число значащих цифр результата каждой операции
+        self.precision = precision
+        self.decimal_context = decimal.Context(prec=precision)
+
+    def format(self, value):
+        # Без хвостовых нулей и без экспоненты: 0.30 -> 0.3, 1E+2 -> 100
+        return format(value.normalize(self.decimal_context), 'f')
+
+    def context(self):
+        return decimal.localcontext(self.decimal_context)
+
+    def evaluate(self, function, *args):
+        with decimal.localcontext(self.decimal_context):
+            return function(*args)
+
+    def __repr__(self):
+        return f'DecimalBackend(precision={self.precision})'
+
+
+class FractionBackend(NumericBackend):
+    """Точные дроби fractions.Fraction: 1 ÷ 3 × 3 дает ровно 1"""
+
+    name = 'fraction'
+    type = Fraction
+
+    def literal(self, value):
+        text = self.format(value)
+        # 3/10 в выражении должно остаться одним числом
+        return f'({text})' if '/' in text else text
+
+
+def display_text(text, length=DISPLAY_LENGTH):
+    """Число для метки: не длиннее length символов, полное значение не меняется"""
+    if len(text) <= length:
+        return text
+    numerator, _, denominator = text.strip('()').partition('/')
+    try:
+        with decimal.localcontext(DISPLAY_CONTEXT):
+            value = +decimal.Decimal(numerator)
+            if denominator:
+                value /= decimal.Decimal(denominator)
+            value = value.normalize()
+    except (ValueError, ArithmeticError):
+        return text[:length - 1] + '…'
+    if -5 <= value.adjusted() < DISPLAY_DIGITS:
+        return format(value, 'f')
+    return format(value, 'e')
+
+
+def display_expression(text, length=DISPLAY_LENGTH):
+    """Выражение для метки: длинные числа между пробелами сокращаются"""
+    if len(text) <= length:
+        return text
+    return ' '.join([display_text(token, length) for token in text.split(' ')])
+
+
+BACKENDS = {
+    'float': FloatBackend,
+    'decimal': DecimalBackend,
+    'fraction': FractionBackend,
+}
+
+FLOAT = FloatBackend()
+
+# Бэкенды по (имя, параметры): кэш выражений различает бэкенды по объекту,
+# поэтому одинаковые настройки должны давать один и тот же объект
+_backends = {('float', ()): FLOAT}
+
+
+def get_backend(name=None, **options):
+    """Бэкенд по имени; по умолчанию из CALCUHILL_NUMERIC (float, decimal, fraction)"""
+    if name is None:
+        name = os.environ.get('CALCUHILL_NUMERIC', 'float')
+        if name == 'decimal' and 'precision' not in options:
+            options['precision'] = int(os.environ.get('CALCUHILL_DECIMAL_PRECISION', DECIMAL_PRECISION))
+    key = (name, tuple(sorted(options.items())))
+    backend = _backends.get(key)
+    if backend is None:
+        backend = _backends[key] = BACKENDS[name](**options)
+    return backend
@@ -0,0 +1,131 @@
+from collections import deque
+from contextlib import nullcontext
+import atexit
+import json
+import os
+import time
+
+# Сколько последних замеров каждого участка держит кольцевой буфер
+RING_SIZE = 4096
+# Бюджет кадра при 60 FPS: участок дольше него задерживает кадр
+FRAME_BUDGET_MS = 1000.0 / 60
+# Кадр считается пропущенным, если между кадрами прошло больше полутора бюджетов
+FRAME_SLACK = 1.5
+PROFILE_FILE = 'calcuhill_profile.json'
+# Общий пустой контекст для span выключенного профайлера: без создания объекта на вызов
+NO_SPAN = nullcontext()
+
+
+class Span:
+    """Замер одного участка в блоке with"""
+
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+
+
+class Profiler:
+    """Легкий профайлер горячих участков: старт, кадры, вычисления, история"""
+
+    def __init__(self, enabled=None, size=RING_SIZE, budget_ms=FRAME_BUDGET_MS, path=None):
+        # Выключен по умолчанию и тогда ничего не стоит; CALCUHILL_PROFILE=1 нужно
+        # задать до импорта модулей приложения, статистика пишется в JSON при выходе
+        if enabled is None:
+            enabled = os.environ.get('CALCUHILL_PROFILE', '0') == '1'
+        self.enabled = enabled
+        self.size = size
+        self.budget = budget_ms / 1000.0
+        self.path = path or os.environ.get('CALCUHILL_PROFILE_FILE', PROFILE_FILE)
+        self.spans = {}
+        self.counts = {}
+        self.overruns = {}
+        self.thresholds = {'frame': self.budget * FRAME_SLACK}
+        self.frame_event = None
+        if enabled and path is None:
+            atexit.register(self.dump)
+
+    def record(self, name, seconds):
+        """Добавляем замер участка name длительностью seconds"""
+        ring = self.spans.get(name)
+        if ring is None:
+            ring = self.spans[name] = deque(maxlen=self.size)
+            self.counts[name] = 0
+            self.overruns[name] = 0
+        ring.append(seconds)
+        self.counts[name] += 1
+        if seconds > self.thresholds.get(name, self.budget):
+            self.overruns[name] += 1
+
+    def span(self, name):
+        """Контекстный менеджер замера; выключенный профайлер ничего не замеряет"""
+        if not self.enabled:
+            return NO_SPAN
+        return Span(self, name)
+
+    def wrap(self, name, function):
+        """Функция, каждый вызов которой замеряется как участок name"""
+        if not self.enabled:
+            return function
+        record = self.record
+        perf_counter = time.perf_counter
+
+        def profiled(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, perf_counter() - start)
+        profiled.__name__ = function.__name__
+        profiled.__doc__ = function.__doc__
+        profiled.__wrapped__ = function
+        return profiled
+
+    def profiled(self, name):
+        """Декоратор для wrap"""
+        return lambda function: self.wrap(name, function)
+
+    def watch_frames(self):
+        """Замеряем интервал между кадрами Kivy как участок 'frame'"""
+        if not self.enabled or self.frame_event is not None:
+            return
+        from kivy.clock import Clock
+        self.frame_event = Clock.schedule_interval(lambda dt: self.record('frame', dt), 0)
+
+    def stats(self):
+        """p50/p95/p99/max в мс по последним замерам и счетчики по всем"""
+        result = {}
+        for name, ring in self.spans.items():
+            ordered = sorted(ring)
+            last = len(ordered) - 1
+            result[name] = {
+                'count': self.counts[name],
+                'p50_ms': ordered[last * 50 // 100] * 1000.0,
+                'p95_ms': ordered[last * 95 // 100] * 1000.0,
+                'p99_ms': ordered[last * 99 // 100] * 1000.0,
+                'max_ms': ordered[-1] * 1000.0,
+                'overruns': self.overruns[name],
+            }
+        return result
+
+    def clear(self):
+        self.spans.clear()
+        self.counts.clear()
+        self.overruns.clear()
+
+    def dump(self, path=None):
+        """Пишем статистику в JSON"""
+        with open(path or self.path, 'w', encoding='utf-8') as f:
+            json.dump({'budget_ms': self.budget * 1000.0, 'spans': self.stats()}, f, ensure_ascii=False, indent=2)
+
+
+profiler = Profiler()
+profiled = profiler.profiled
@@ -0,0 +1,167 @@
+import math
+import os
+
+from lru import LRUCache
+
+# Сколько результатов держит общий кэш научных функций
+MEMO_SIZE = 1024
+
+# Точные значения для «табличных» углов в градусах, без вызова тригонометрии
+SIN_EXACT = {0.0: 0.0, 30.0: 0.5, 90.0: 1.0, 150.0: 0.5, 180.0: 0.0, 210.0: -0.5, 270.0: -1.0, 330.0: -0.5}
+COS_EXACT = {0.0: 1.0, 60.0: 0.5, 90.0: 0.0, 120.0: -0.5, 180.0: -1.0, 240.0: -0.5, 270.0: 0.0, 300.0: 0.5}
+TAN_EXACT = {0.0: 0.0, 45.0: 1.0, 135.0: -1.0, 180.0: 0.0, 225.0: 1.0, 315.0: -1.0}
+
+
+def sin(x):
+    """Синус угла в градусах"""
+    x = float(x)
+    exact = SIN_EXACT.get(x % 360.0)
+    if exact is not None:
+        return exact
+    return math.sin(math.radians(x))
+
+
+def cos(x):
+    """Косинус угла в градусах"""
+    x = float(x)
+    exact = COS_EXACT.get(x % 360.0)
+    if exact is not None:
+        return exact
+    return math.cos(math.radians(x))
+
+
+def tan(x):
+    """Тангенс угла в градусах"""
+    x = float(x)
+    exact = TAN_EXACT.get(x % 360.0)
+    if exact is not None:
+        return exact
+    return math.tan(math.radians(x))
+
+
+def log(x):
+    """Десятичный логарифм"""
+    return math.log10(x)
+
+
+def ln(x):
+    """Натуральный логарифм"""
+    return math.log(x)
+
+
+def sqrt(x):
+    return math.sqrt(x)
+
+
+def square(x):
+    return x * x
+
+
+def cube(x):
+    return x * x * x
+
+
+def inverse(x):
+    return 1 / x
+
+
+def pi():
+    return math.pi
+
+
+def e():
+    return math.e
+
+
+class FunctionMemo:
+    """Общий LRU-кэш результатов чистых функций по ключу (имя, тип и значение аргумента)"""
+
+    # Кэш выключен по умолчанию: в CPython вызов math.sin дешевле поиска в
+    # словаре, и кэш окупается только для дорогих функций или табличных
+    # расчетов с повторами. Включается аргументом enabled или переменной
+    # окружения CALCUHILL_MEMO=1; выключенный кэш отдает функции как есть.
+    # Ошибки области определения не кэшируются, NaN в кэш не попадает.
+
+    def __init__(self, maxsize=MEMO_SIZE, enabled=None):
+        if enabled is None:
+            enabled = os.environ.get('CALCUHILL_MEMO', '0') == '1'
+        self.enabled = enabled
+        self.cache = LRUCache(maxsize)
+
+    def wrap(self, name, function):
+        """Функция одного аргумента, отвечающая из кэша"""
+        if not self.enabled:
+            return function
+        cache = self.cache
+
+        def memoized(x):
+            # Тип в ключе: Decimal(1) и 1.0 равны, но результат у них разный
+            key = (name, x.__class__, x)
+            result = cache.get(key)
+            if result is None:
+                result = function(x)
+                if x == x:
+                    cache.put(key, result)
+            return result
+        memoized.__name__ = function.__name__
+        memoized.__doc__ = function.__doc__
+        return memoized
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        return self.cache.stats()
+
+
+memo = FunctionMemo()
+
+
+class Operation:
+    """Операция реестра: функция, число аргументов и область определения"""
+
+    __slots__ = ('name', 'function', 'arity', 'domain', 'domain_error')
+
+    def __init__(self, name, function, arity, domain=None, domain_error=''):
+        self.name = name
+        self.function = function
+        self.arity = arity
+        self.domain = domain
+        self.domain_error = domain_error
+
+    def __call__(self, *args):
+        # ValueError с понятным сообщением, как и при разборе выражений
+        if len(args) != self.arity:
+            raise ValueError(f'{self.name}: нужно аргументов: {self.arity}')
+        if self.domain is not None and not self.domain(*args):
+            raise ValueError(f'{self.name}: {self.domain_error}')
+        return self.function(*args)
+
+    def __repr__(self):
+        return f'Operation({self.name!r}, arity={self.arity})'
+
+
+# Реестр операций по имени: его используют ScientificPanel, CalculatorEngine
+# и вычисление выражений
+OPERATIONS = {}
+
+
+def register(name, function, arity=1, domain=None, domain_error='вне области определения', memoize=False):
+    """Добавляем операцию в реестр; memoize пускает вызовы через общий кэш"""
+    if memoize:
+        function = memo.wrap(name, function)
+    OPERATIONS[name] = Operation(name, function, arity, domain, domain_error)
+
+
+register('sin', sin, memoize=True)
+register('cos', cos, memoize=True)
+register('tan', tan, domain=lambda x: float(x) % 180.0 != 90.0, domain_error='тангенс не определен', memoize=True)
+register('log', log, domain=lambda x: x > 0, domain_error='логарифм определен для x > 0', memoize=True)
+register('ln', ln, domain=lambda x: x > 0, domain_error='логарифм определен для x > 0', memoize=True)
+register('sqrt', sqrt, domain=lambda x: x >= 0, domain_error='корень определен для x >= 0', memoize=True)
+register('square', square)
+register('cube', cube)
+register('inverse', inverse, domain=lambda x: x != 0, domain_error='деление на ноль')
+register('pi', pi, arity=0)
+register('e', e, arity=0)
+register('abs', abs)
@@ -0,0 +1,112 @@
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.logger import Logger
+from kivy.uix.widget import Widget
+from profiler import profiler
+import os
+import time
+
+
+class StagedBuild:
+    """Построение интерфейса по кадрам: сначала дисплей и клавиатура, остальное этапами"""
+
+    def __init__(self, staged=None):
+        # Без поэтапного режима (staged=False или CALCUHILL_STAGED=0) все этапы выполняются в start
+        if staged is None:
+            staged = os.environ.get('CALCUHILL_STAGED', '1') != '0'
+        self.staged = staged
+        self.stages = []
+        self.timings = []
+        self.event = None
+        self.started = time.perf_counter()
+        self.interactive = None
+        self.complete = None
+
+    def reserve(self, parent, **kwargs):
+        """Пустой виджет на месте будущей части интерфейса, чтобы клавиатура не меняла размер"""
+        slot = Widget(**kwargs)
+        parent.add_widget(slot)
+        return slot
+
+    def add(self, name, build, slot=None):
+        """Этап: build() строит часть интерфейса и возвращает ее виджет для slot"""
+        self.stages.append((name, build, slot))
+
+    def start(self):
+        Window.bind(on_flip=self.on_first_frame)
+        if not self.staged:
+            self.finish()
+
+    def on_first_frame(self, *args):
+        Window.unbind(on_flip=self.on_first_frame)
+        self.interactive = time.perf_counter() - self.started
+        if profiler.enabled:
+            profiler.record('startup.first_frame', self.interactive)
+            profiler.watch_frames()
+        # Клавиатура уже видна и нажимается; остальное достраивается по этапу за кадр
+        if self.stages:
+            self.event = Clock.schedule_once(self.next_stage)
+        else:
+            self.log()
+
+    def next_stage(self, dt):
+        self.event = None
+        self.run_stage()
+        if self.stages:
+            self.event = Clock.schedule_once(self.next_stage)
+
+    def run_stage(self):
+        name, build, slot = self.stages.pop(0)
+        start = time.perf_counter()
+        widget = build()
+        if slot is not None:
+            parent = slot.parent
+            index = parent.children.index(slot)
+            parent.remove_widget(slot)
+            parent.add_widget(widget, index=index)
+        seconds = time.perf_counter() - start
+        self.timings.append((name, seconds * 1000.0))
+        if profiler.enabled:
+            profiler.record(f'startup.{name}', seconds)
+        if not self.stages:
+            self.complete = time.perf_counter() - self.started
+            if profiler.enabled:
+                profiler.record('startup.complete', self.complete)
+            if self.interactive is not None:
+                self.log()
+
+    def finish(self, name=None):
+        """Достраиваем сейчас все этапы или только до name включительно (часть интерфейса нужна раньше)"""
+        if name is not None and all(stage[0] != name for stage in self.stages):
+            return
+        if self.event is not None:
+            self.event.cancel()
+            self.event = None
+        while self.stages:
+            done = self.stages[0][0] == name
+            self.run_stage()
+            if done:
+                break
+        if self.stages and self.interactive is not None:
+            self.event = Clock.schedule_once(self.next_stage)
+
+    @property
+    def done(self):
+        return not self.stages
+
+    def report(self):
+        """Время до первого кадра, до полного построения и длительность этапов в мс"""
+        return {
+            'staged': self.staged,
+            'interactive_ms': None if self.interactive is None else self.interactive * 1000.0,
+            'complete_ms': None if self.complete is None else self.complete * 1000.0,
+            'stages': dict(self.timings),
+        }
+
+    def log(self):
+        report = self.report()
+        stages = ', '.join(f'{name} {ms:.1f}' for name, ms in report['stages'].items())
+        Logger.info(
+            f"Startup: first frame {report['interactive_ms']:.1f} ms, "
+            f"complete {report['complete_ms'] or report['interactive_ms']:.1f} ms ({stages})"
+        )
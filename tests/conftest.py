@@ -0,0 +1,12 @@
+"""Тесты импортируют модули приложения из корня репозитория"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Kivy не разбирает аргументы pytest и не пишет лог в консоль
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
@@ -0,0 +1,98 @@
+from array import array
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from batch import apply_batch, evaluate_batch
+from numeric import get_backend
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+needs_numpy = pytest.mark.skipif(numpy is None, reason='нужен numpy')
+
+
+def test_rows_report_errors_per_element():
+    result = apply_batch('÷', [1, 6, 3], [0, 3, 4])
+    assert result.errors == [True, False, False]
+    assert result.texts() == ['Ошибка', '2', '0.75']
+
+
+def test_keypad_percent_and_sign():
+    assert apply_batch('%', [50, 7]).texts() == ['0.5', '0.07']
+    assert apply_batch('±', array('d', [1.5, -2.0])).values == [-1.5, 2.0]
+
+
+def test_function_with_exact_angles():
+    assert apply_batch('sin', [30, 90, 210]).values == [0.5, 1.0, -0.5]
+
+
+@needs_numpy
+def test_vector_matches_rows():
+    values = [0.5, 30.0, 0.0, -4.0, 1e300]
+    expression = 'sqrt(x) * 2 + x ^ 2 / (x - 30)'
+    rows = evaluate_batch(expression, {'x': values}, vectorized=False)
+    vector = evaluate_batch(expression, {'x': numpy.array(values)})
+    assert vector.errors.tolist() == rows.errors
+    for value, expected, error in zip(vector.values.tolist(), rows.values, rows.errors):
+        if not error:
+            assert value == pytest.approx(expected)
+
+
+@needs_numpy
+def test_vector_mixes_scalar_and_column():
+    x = numpy.array([0.0, 1.0, 2.0])
+    assert evaluate_batch('sin(30) + x', {'x': x}).values.tolist() == [0.5, 1.5, 2.5]
+    assert evaluate_batch('sin(x) + cos(60)', {'x': numpy.array([30.0])}).values.tolist() == [1.0]
+
+
+@needs_numpy
+def test_vector_scalar_outside_domain_marks_every_row():
+    result = evaluate_batch('sqrt(-1) + x', {'x': numpy.array([1.0, 2.0])})
+    assert result.errors.tolist() == [True, True]
+    assert numpy.isnan(result.values).all()
+
+
+@needs_numpy
+def test_vector_domain_errors():
+    result = evaluate_batch('log(x)', {'x': numpy.array([100.0, 0.0, -1.0])})
+    assert result.errors.tolist() == [False, True, True]
+    assert result.values[0] == 2.0
+
+
+@needs_numpy
+@pytest.mark.parametrize('name, expected', [
+    ('decimal', [Decimal('0.3'), Decimal('0.6')]),
+    ('fraction', [Fraction(3, 10), Fraction(3, 5)]),
+])
+def test_exact_backends_accept_numpy_columns(name, expected):
+    result = evaluate_batch('x * 3', {'x': numpy.array([0.1, 0.2])}, backend=get_backend(name))
+    assert result.values == expected
+    assert result.errors == [False, False]
+
+
+@needs_numpy
+@pytest.mark.parametrize('name', ['decimal', 'fraction'])
+def test_exact_backends_numpy_constant(name):
+    result = evaluate_batch('x + y', {'x': [1, 2], 'y': numpy.float64(0.5)}, backend=get_backend(name))
+    assert result.texts() == (['1.5', '2.5'] if name == 'decimal' else ['3/2', '5/2'])
+
+
+@pytest.mark.parametrize('name', ['float', 'decimal', 'fraction'])
+def test_bad_value_fails_only_its_row(name):
+    result = apply_batch('+', [1, 'abc', 3], 1, backend=get_backend(name))
+    assert result.errors == [False, True, False]
+    assert result.texts()[1] == 'Ошибка'
+
+
+def test_decimal_division_by_zero_per_row():
+    result = apply_batch('/', [1, 2], [0, 8], backend=get_backend('decimal'))
+    assert result.texts() == ['Ошибка', '0.25']
+
+
+def test_unknown_operation():
+    with pytest.raises(ValueError):
+        apply_batch('mod', [1, 2])
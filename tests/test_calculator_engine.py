@@ -0,0 +1,117 @@
+import pytest
+
+from calculator_engine import ERROR_TEXT, CalculatorEngine
+from numeric import get_backend
+
+
+def press(engine, keys):
+    for key in keys.split():
+        if key == '=':
+            engine.calculate()
+        elif key in ('+', '-', '*', '/', '^'):
+            engine.set_operation(key)
+        else:
+            for digit in key:
+                engine.add_number(digit)
+
+
+def test_operators_wait_for_equals():
+    engine = CalculatorEngine()
+    press(engine, '2 + 3 *')
+    assert engine.expression_text == '2 + 3 ×'
+    press(engine, '4')
+    assert engine.calculate() == ('2 + 3 * 4', '14')
+    assert engine.result_text == '14'
+
+
+def test_repeated_operator_replaces_previous():
+    engine = CalculatorEngine()
+    press(engine, '6 + - * 2 =')
+    assert engine.result_text == '12'
+
+
+def test_int_division_result():
+    engine = CalculatorEngine()
+    press(engine, '6 / 3 =')
+    assert engine.result_text == '2'
+    press(engine, '/ 4 =')
+    assert engine.result_text == '0.5'
+
+
+def test_fail_resets_expression():
+    results = []
+    engine = CalculatorEngine(on_result=lambda expression, result: results.append(result))
+    press(engine, '1 + 1 / 0 =')
+    assert engine.result_text == ERROR_TEXT
+    assert engine.pending == [] and engine.expression_text == ''
+    # После ошибки набор начинается заново, как после '='
+    press(engine, '2 + 3 =')
+    assert engine.result_text == '5'
+    assert results == ['5']
+
+
+def test_power_past_limit_fails():
+    engine = CalculatorEngine()
+    press(engine, '10 ^ 5000 =')
+    assert engine.result_text == ERROR_TEXT
+    assert engine.pending == []
+
+
+def test_function_outside_domain_keeps_number():
+    engine = CalculatorEngine()
+    press(engine, '4')
+    engine.negate()
+    engine.apply_function('sqrt')
+    assert engine.result_text == ERROR_TEXT
+    engine.negate()
+    engine.apply_function('sqrt')
+    assert engine.result_text == '2.0'
+
+
+def test_percentage_and_backspace():
+    engine = CalculatorEngine()
+    press(engine, '512')
+    engine.backspace()
+    engine.percentage()
+    assert engine.result_text == '0.51'
+
+
+@pytest.mark.parametrize('name, keys, shown, full', [
+    ('decimal', '0.1 + 0.2 =', '0.3', '0.3'),
+    ('decimal', '1 / 3 =', '0.3333333333333333', '0.3333333333333333333333333333'),
+    ('decimal', '25 * 4 =', '100', '100'),
+    ('fraction', '1 / 3 =', '1/3', '1/3'),
+    ('fraction', '1 / 3 * 3 =', '1', '1'),
+    ('fraction', '0.1 + 0.2 =', '3/10', '3/10'),
+])
+def test_exact_backends_format(name, keys, shown, full):
+    results = []
+    engine = CalculatorEngine(on_result=lambda expression, result: results.append(result), backend=get_backend(name))
+    press(engine, keys)
+    assert engine.result_text == shown
+    assert results == [full]
+
+
+def test_fraction_result_chains_as_one_number():
+    engine = CalculatorEngine(backend=get_backend('fraction'))
+    press(engine, '1 / 3 = * 3 =')
+    assert engine.result_text == '1'
+
+
+def test_long_result_is_shortened_only_on_display():
+    history = []
+    engine = CalculatorEngine(on_result=lambda expression, result: history.append(result))
+    press(engine, '9 ^ 4000 =')
+    assert history == [str(9 ** 4000)]
+    assert engine.result_text == '9.333354408883458e+3816'
+    # Следующая операция берет полное значение из буфера
+    press(engine, '+')
+    assert engine.expression_text == '9.333354408883458e+3816 +'
+    press(engine, '1 =')
+    assert history[-1] == str(9 ** 4000 + 1)
+
+
+def test_long_expression_is_shortened():
+    engine = CalculatorEngine(backend=get_backend('fraction'))
+    press(engine, '1 / 3 = * 123456789012345678901234567890 *')
+    assert engine.expression_text == '(1/3) × 1.234567890123457e+29 ×'
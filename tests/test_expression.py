@@ -0,0 +1,101 @@
+import pytest
+
+from expression import (
+    BIN, INT_POWER_BITS, NEG, NUM, VAR,
+    Expression, ExpressionCache, ExpressionError, evaluate, normalize, parse,
+)
+from numeric import get_backend
+
+
+@pytest.mark.parametrize('text, value', [
+    ('2 + 3 × 4', 14),
+    ('(2 + 3) * 4', 20),
+    ('10 - 4 - 3', 3),
+    ('2 ^ 3 ^ 2', 512),
+    ('2 ** 10', 1024),
+    ('-2 ^ 2', -4),
+    ('2 ^ -1', 0.5),
+    ('--3', 3),
+    ('3 − -2', 5),
+    ('1 + 2 * 3 ^ 2 / 6', 4),
+])
+def test_precedence_and_unary_minus(text, value):
+    assert Expression(text).evaluate() == value
+
+
+def test_unary_minus_binds_weaker_than_power():
+    assert parse('-x ^ 2') == (NEG, (BIN, '^', (VAR, 'x'), (NUM, 2)))
+    assert Expression('-x ^ 2').evaluate({'x': 3}) == -9
+
+
+def test_constants_are_folded():
+    assert parse('2 + 3 × 4') == (NUM, 14)
+
+
+def test_int_division_stays_exact():
+    assert Expression('6 ÷ 3').evaluate() == 2
+    assert type(Expression('6 ÷ 3').evaluate()) is int
+    assert Expression('7 / 2').evaluate() == 3.5
+    big = 3 ** 200
+    assert Expression(f'{big * 7} / 7').evaluate() == big
+
+
+@pytest.mark.parametrize('text', ['1 / 0', 'x / 0'])
+def test_division_by_zero(text):
+    with pytest.raises(ExpressionError):
+        Expression(text).evaluate({'x': 1})
+
+
+def test_power_limit():
+    # Пока целое укладывается в INT_POWER_BITS, результат точный
+    assert Expression(f'2 ^ {INT_POWER_BITS}').evaluate() == 2 ** INT_POWER_BITS
+    # Дальше степень считается во float и переполняется с понятной ошибкой
+    with pytest.raises(ExpressionError):
+        Expression(f'2 ^ {INT_POWER_BITS + 1}').evaluate()
+    assert Expression(f'0.5 ^ {INT_POWER_BITS + 1}').evaluate() == 0.0
+
+
+@pytest.mark.parametrize('text', ['', '2 +', '(1', '1 2', 'sin(', '2 $ 3'])
+def test_syntax_errors(text):
+    with pytest.raises(ExpressionError):
+        parse(text)
+
+
+@pytest.mark.parametrize('text', ['x * (y - 2) ^ 2 / 4', '-x + sin(y) * 3', 'x / y - 1', 'abs(x - y)'])
+def test_compiled_matches_tree(text):
+    expression = Expression(text)
+    for x, y in [(1, 2), (3, 5), (-4, 0.5)]:
+        variables = {'x': x, 'y': y}
+        assert expression.evaluate(variables) == evaluate(expression.tree, variables)
+
+
+def test_unknown_names():
+    with pytest.raises(ExpressionError):
+        Expression('x + 1').evaluate({})
+    with pytest.raises(ExpressionError):
+        Expression('foo(1)').evaluate()
+
+
+def test_decimal_and_fraction_backends():
+    assert Expression('0.1 + 0.2', get_backend('decimal')).evaluate() == get_backend('decimal').parse('0.3')
+    fraction = get_backend('fraction')
+    assert Expression('1 / 3 * 3', fraction).evaluate() == 1
+
+
+def test_normalize_joins_tokens():
+    assert normalize(' 2 ** 3 × x ') == normalize('2^3*x') == '2 ^ 3 * x'
+    assert normalize('sin (x) − 1') == 'sin ( x ) - 1'
+
+
+def test_cache_shares_equivalent_spellings():
+    cache = ExpressionCache()
+    assert cache.get('2**3') is cache.get('2 ^ 3')
+    assert cache.get('2 ^ 3').evaluate() == 8
+
+
+def test_cache_keeps_separate_operators_apart():
+    cache = ExpressionCache()
+    assert normalize('2 * * 3') != normalize('2 ** 3')
+    with pytest.raises(ExpressionError):
+        cache.get('2 * * 3')
+    assert len(cache.compiled) == 0
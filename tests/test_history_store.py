@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+import history_store
+from history_store import HistoryStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'data' / 'history.jsonl')
+
+
+def fill(path, count):
+    store = HistoryStore(path, flush_interval=10.0)
+    for n in range(count):
+        store.append(f'{n}+{n}', str(2 * n))
+    store.close()
+
+
+def load(path, limit=history_store.HISTORY_LIMIT):
+    store = HistoryStore(path)
+    records = store.load_recent(limit)
+    store.close()
+    return records
+
+
+def test_append_close_reload_keeps_order(path):
+    fill(path, 5)
+    records = load(path)
+    assert [record['expression'] for record in records] == [f'{n}+{n}' for n in range(5)]
+    assert records[-1]['result'] == '8'
+
+
+def test_flush_writes_before_interval(path):
+    store = HistoryStore(path, flush_interval=60.0)
+    store.append('1+1', '2')
+    store.flush()
+    with open(path, encoding='utf-8') as f:
+        assert json.loads(f.readline())['expression'] == '1+1'
+    store.close()
+
+
+def test_append_after_close_is_dropped(path):
+    store = HistoryStore(path)
+    store.append('1+1', '2')
+    store.close()
+    store.append('2+2', '4')
+    assert [record['result'] for record in load(path)] == ['2']
+
+
+def test_partial_last_line(path):
+    fill(path, 3)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"expression": "9+')
+    store = HistoryStore(path)
+    assert [record['result'] for record in store.load_recent()] == ['0', '2', '4']
+    # Новая запись не приклеивается к оборванной строке
+    store.append('5+5', '10')
+    store.close()
+    assert [record['result'] for record in load(path)] == ['0', '2', '4', '10']
+
+
+@pytest.mark.parametrize('limit', [0, 1, 7, 40, 99, 100, 500])
+def test_load_recent_across_blocks(path, monkeypatch, limit):
+    # Блок меньше строки: запись разрезается границами блоков
+    monkeypatch.setattr(history_store, 'READ_BLOCK', 37)
+    fill(path, 100)
+    records = load(path, limit)
+    expected = [str(2 * n) for n in range(100)][-limit:] if limit else []
+    assert [record['result'] for record in records] == expected
+
+
+def test_missing_file(path):
+    assert load(path) == []
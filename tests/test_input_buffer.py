@@ -0,0 +1,38 @@
+from input_buffer import InputBuffer
+
+
+def typed(keys):
+    """Буфер после набора keys: 'e' начинает порядок, '±' меняет знак"""
+    buffer = InputBuffer()
+    buffer.clear()
+    for key in keys:
+        if key == 'e':
+            buffer.start_exponent()
+        elif key == '±':
+            buffer.negate()
+        else:
+            buffer.append(key)
+    return buffer
+
+
+def test_incomplete_exponent_is_dropped():
+    assert typed('1.5e').number_text() == '1.5'
+
+
+def test_incomplete_negative_exponent_is_dropped():
+    buffer = typed('1e±')
+    assert buffer.text == '1e-'
+    assert buffer.number_text() == '1'
+    float(buffer.number_text())
+
+
+def test_negative_number_with_incomplete_exponent():
+    buffer = typed('±25e±')
+    assert buffer.text == '-25e-'
+    assert buffer.number_text() == '-25'
+
+
+def test_complete_exponent_is_kept():
+    buffer = typed('1e±5')
+    assert buffer.number_text() == '1e-5'
+    assert float(buffer.number_text()) == 1e-5
@@ -0,0 +1,34 @@
+from lru import LRUCache
+
+
+def test_get_refreshes_and_put_evicts_oldest():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert len(cache) == 2
+
+
+def test_put_existing_key_does_not_evict():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.put('a', 10)
+    assert cache.get('a') == 10
+    assert cache.get('b') == 2
+    assert cache.stats()['evictions'] == 0
+
+
+def test_stats_and_clear():
+    cache = LRUCache(1)
+    cache.get('a')
+    cache.put('a', 1)
+    cache.get('a')
+    cache.put('b', 2)
+    assert cache.stats() == {'size': 1, 'maxsize': 1, 'hits': 1, 'misses': 1, 'evictions': 1}
+    cache.clear()
+    assert len(cache) == 0
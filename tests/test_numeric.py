@@ -0,0 +1,70 @@
+from decimal import Decimal
+from fractions import Fraction
+import math
+
+import pytest
+
+from numeric import DISPLAY_LENGTH, FLOAT, display_expression, display_text, get_backend
+
+
+def test_float_backend_keeps_ints():
+    assert FLOAT.parse('12') == 12 and type(FLOAT.parse('12')) is int
+    assert type(FLOAT.parse('1.5')) is float
+    assert FLOAT.parse('1e3') == 1000.0
+    assert type(get_backend('float', integers=False).parse('12')) is float
+
+
+def test_float_backend_coerce():
+    assert FLOAT.coerce(3) == 3 and type(FLOAT.coerce(3)) is int
+    assert type(FLOAT.coerce(Decimal('0.5'))) is float
+
+
+@pytest.mark.parametrize('value, text', [
+    (Decimal('0.30'), '0.3'),
+    (Decimal('1E+2'), '100'),
+    (Decimal('1.2500'), '1.25'),
+])
+def test_decimal_format(value, text):
+    assert get_backend('decimal').format(value) == text
+
+
+def test_decimal_precision():
+    backend = get_backend('decimal', precision=5)
+    assert backend.evaluate(lambda: Decimal(1) / Decimal(3)) == Decimal('0.33333')
+    assert backend.coerce(math.pi) == Decimal(repr(math.pi))
+
+
+def test_fraction_format_and_literal():
+    backend = get_backend('fraction')
+    assert backend.format(Fraction(3, 10)) == '3/10'
+    assert backend.literal(Fraction(-3, 10)) == '(-3/10)'
+    assert backend.literal(Fraction(4)) == '4'
+    assert backend.parse('0.1') == Fraction(1, 10)
+    assert backend.coerce(0.5) == Fraction(1, 2)
+
+
+def test_get_backend_reuses_objects():
+    assert get_backend('float') is FLOAT
+    assert get_backend('decimal', precision=10) is get_backend('decimal', precision=10)
+
+
+@pytest.mark.parametrize('text, shown', [
+    ('123', '123'),
+    (str(2 ** 100), '1.267650600228229e+30'),
+    ('-' + str(7 ** 40), '-6.366805760909028e+33'),
+    ('0.' + '3' * 40, '0.3333333333333333'),
+    ('1' + '0' * 30, '1e+30'),
+    ('1/' + str(3 ** 50), '1.392955569098538e-24'),
+    ('(' + str(2 ** 100) + '/3)', '4.225502000760763e+29'),
+])
+def test_display_text(text, shown):
+    assert display_text(text) == shown
+    assert len(display_text(text)) <= DISPLAY_LENGTH
+
+
+def test_display_text_huge_power():
+    assert display_text(str(9 ** 4000)) == '9.333354408883458e+3816'
+
+
+def test_display_expression_shortens_numbers_only():
+    assert display_expression(str(2 ** 100) + ' × 2 +') == '1.267650600228229e+30 × 2 +'
@@ -0,0 +1,61 @@
+from decimal import Decimal
+
+import pytest
+
+import scientific
+from scientific import FunctionMemo
+
+
+def test_exact_angles():
+    assert scientific.sin(30) == 0.5
+    assert scientific.cos(60) == 0.5
+    assert scientific.tan(45) == 1.0
+    assert scientific.sin(-330) == 0.5
+
+
+def test_tan_domain():
+    with pytest.raises(ValueError):
+        scientific.OPERATIONS['tan'](270)
+
+
+def test_memo_off_by_default(monkeypatch):
+    monkeypatch.delenv('CALCUHILL_MEMO', raising=False)
+    memo = FunctionMemo()
+    assert memo.wrap('sin', scientific.sin) is scientific.sin
+
+
+def test_memo_enabled_by_environment(monkeypatch):
+    monkeypatch.setenv('CALCUHILL_MEMO', '1')
+    assert FunctionMemo().enabled
+
+
+def test_memo_hits_and_evicts():
+    calls = []
+
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    memo = FunctionMemo(maxsize=2, enabled=True)
+    memoized = memo.wrap('square', square)
+    assert [memoized(x) for x in (2, 3, 2, 4, 3)] == [4, 9, 4, 16, 9]
+    # 3 вытеснена записью для 4, пока 2 была свежее
+    assert calls == [2, 3, 4, 3]
+    assert memo.stats() == {'size': 2, 'maxsize': 2, 'hits': 1, 'misses': 4, 'evictions': 2}
+
+
+def test_memo_key_includes_type():
+    memo = FunctionMemo(enabled=True)
+    memoized = memo.wrap('square', scientific.square)
+    assert memoized(1.5) == 2.25
+    assert memoized(Decimal('1.5')) == Decimal('2.25')
+    assert isinstance(memoized(Decimal('1.5')), Decimal)
+
+
+def test_memo_skips_nan_and_errors():
+    memo = FunctionMemo(enabled=True)
+    memoized = memo.wrap('ln', scientific.ln)
+    with pytest.raises(ValueError):
+        memoized(-1.0)
+    memoized(float('nan'))
+    assert memo.stats()['size'] == 0